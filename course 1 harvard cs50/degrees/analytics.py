@@ -0,0 +1,223 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+from batch import init_worker
+from graph import UNREACHABLE
+
+COLUMNS = ("person_id", "name", "movies", "costars", "component",
+           "distance", "closeness")
+
+
+def costar_counts(start, end):
+    """
+    Returns (start, counts) where counts holds the number of distinct
+    co-stars of each person in range(start, end).
+    """
+    graph = degrees.graph
+    counts = array("i")
+    for person in range(start, end):
+        stars = set()
+        for movie in graph.movies_of(person):
+            stars.update(graph.stars_of(movie))
+        stars.discard(person)
+        counts.append(len(stars))
+    return start, counts
+
+
+def pivot_sums(pivots):
+    """
+    Returns (totals, reached): for every person, the sum of distances
+    from the given pivots and the number of pivots that reach them.
+    """
+    graph = degrees.graph
+    totals = array("q", [0]) * graph.num_people
+    reached = array("i", [0]) * graph.num_people
+    for pivot in pivots:
+        for person, distance in enumerate(graph.distances(pivot)):
+            if distance != UNREACHABLE:
+                totals[person] += distance
+                reached[person] += 1
+    return totals, reached
+
+
+def distance_histogram(distances):
+    """
+    Returns a dict mapping each distance to the number of people at it,
+    with unreachable people counted under None.
+    """
+    histogram = {}
+    for distance in distances:
+        key = None if distance == UNREACHABLE else distance
+        histogram[key] = histogram.get(key, 0) + 1
+    return histogram
+
+
+def double_sweep(graph, start, sweeps=4):
+    """
+    Estimates the diameter of the component holding `start` by repeated
+    sweeps, each a breadth-first search from the farthest person found
+    by the previous one.
+
+    Returns (lower, upper, endpoints): the longest shortest path seen,
+    twice the eccentricity of `start` (which no shortest path in the
+    component can exceed), and the two people the lower bound joins.
+    """
+    distances = graph.distances(start)
+    upper = 2 * max(distances)
+    lower, endpoints = 0, (start, start)
+
+    source = start
+    for _ in range(sweeps):
+        farthest = max(range(graph.num_people), key=distances.__getitem__)
+        if distances[farthest] <= lower:
+            break
+        lower, endpoints = distances[farthest], (source, farthest)
+        source = farthest
+        distances = graph.distances(source)
+    return lower, upper, endpoints
+
+
+def run_analytics(directory, center, pivots=64, sweeps=4, workers=None,
+                  seed=0):
+    """
+    Compute graph-wide statistics around the person id `center`.
+
+    Returns (summary, rows): a dict of graph-wide figures and one row
+    per person with the keys in COLUMNS. Co-star counts and the closeness
+    estimate (from breadth-first searches out of `pivots` random people)
+    are spread over `workers` processes that each map the same snapshot.
+    """
+    degrees.load_data(directory, snapshot=True)
+    graph = degrees.graph
+    size = graph.num_people
+    workers = workers or os.cpu_count()
+
+    rng = random.Random(seed)
+    chosen = rng.sample(range(size), min(pivots, size))
+    step = max(1, -(-size // (workers * 4)))
+    ranges = [(start, min(start + step, size)) for start in range(0, size, step)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(directory,)
+    ) as executor:
+        costar_jobs = [executor.submit(costar_counts, *r) for r in ranges]
+        pivot_jobs = [
+            executor.submit(pivot_sums, chosen[i::workers])
+            for i in range(min(workers, len(chosen)))
+        ]
+
+        # The center and diameter searches run here in the meantime
+        root = graph.person_index[center]
+        center_distances = graph.distances(root)
+        lower, upper, endpoints = double_sweep(graph, root, sweeps)
+
+        costars = array("i", [0]) * size
+        for job in costar_jobs:
+            start, counts = job.result()
+            costars[start:start + len(counts)] = counts
+
+        totals = array("q", [0]) * size
+        reached = array("i", [0]) * size
+        for job in pivot_jobs:
+            part_totals, part_reached = job.result()
+            for person in range(size):
+                totals[person] += part_totals[person]
+                reached[person] += part_reached[person]
+
+    rows = []
+    for person in range(size):
+        distance = center_distances[person]
+        closeness = 0.0
+        if totals[person]:
+            closeness = reached[person] / totals[person]
+        rows.append({
+            "person_id": graph.person_ids[person],
+            "name": graph.person_names[person],
+            "movies": graph.popularity(person),
+            "costars": costars[person],
+            "component": graph.components[person],
+            "distance": None if distance == UNREACHABLE else distance,
+            "closeness": closeness,
+        })
+
+    histogram = distance_histogram(center_distances)
+    reachable = [d for d in center_distances if d != UNREACHABLE]
+    summary = {
+        "center": center,
+        "people": size,
+        "movies": graph.num_movies,
+        "components": graph.component_stats()["components"],
+        "distances": {
+            str(key): value for key, value in sorted(
+                histogram.items(), key=lambda item: (item[0] is None, item[0])
+            )
+        },
+        "eccentricity": max(reachable),
+        "mean_distance": sum(reachable) / len(reachable),
+        "diameter_lower": lower,
+        "diameter_upper": upper,
+        "diameter_endpoints": [graph.person_ids[p] for p in endpoints],
+        "max_costars": max(costars, default=0),
+        "pivots": len(chosen),
+    }
+    return summary, rows
+
+
+def write_rows(rows, filename):
+    """
+    Write per-person rows as Parquet if `filename` ends in .parquet
+    (requires pyarrow), otherwise as CSV.
+    """
+    if filename.endswith(".parquet"):
+        import pyarrow
+        import pyarrow.parquet
+        table = pyarrow.Table.from_pylist(rows)
+        pyarrow.parquet.write_table(table, filename)
+        return
+
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Graph-wide degrees statistics"
+    )
+    parser.add_argument("output", help="per-person file (.csv or .parquet)")
+    parser.add_argument("--directory", default="small")
+    parser.add_argument("--center", default="Kevin Bacon",
+                        help="name of the person distances are measured from")
+    parser.add_argument("--pivots", type=int, default=64,
+                        help="random people sampled to estimate closeness")
+    parser.add_argument("--sweeps", type=int, default=4,
+                        help="double-sweep rounds for the diameter estimate")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, snapshot=True)
+    person_ids = degrees.person_ids_for_name(args.center)
+    if not person_ids:
+        sys.exit(f"Person not found: {args.center}")
+
+    summary, rows = run_analytics(
+        args.directory, person_ids[0], args.pivots, args.sweeps,
+        args.workers, args.seed
+    )
+    write_rows(rows, args.output)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
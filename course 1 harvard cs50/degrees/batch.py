@@ -0,0 +1,141 @@
+import argparse
+import csv
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+
+FIELDS = ("source", "target", "source_id", "target_id", "status", "degrees",
+          "path")
+
+
+def init_worker(directory):
+    """
+    Load the graph in a worker process. Every worker maps the same
+    snapshot file read-only, so the OS shares its pages between them.
+    """
+    degrees.load_data(directory, snapshot=True)
+
+
+def solve_source(job):
+    """
+    Answer every target of one source with a single search.
+    """
+    source, targets = job
+    return source, degrees.paths_from(source, targets)
+
+
+def read_pairs(filename):
+    """
+    Returns (source, target) name pairs from a CSV file with
+    `source` and `target` columns.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        return [(row["source"], row["target"]) for row in csv.DictReader(f)]
+
+
+def resolve(name):
+    """
+    Returns (person_id, None) for a name, or (None, status) if the name
+    is unknown or ambiguous.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        return None, "not found"
+    if len(person_ids) > 1:
+        return None, "ambiguous"
+    return person_ids[0], None
+
+
+def run_batch(directory, pairs, workers=None):
+    """
+    Answer many (source, target) name pairs, running one search per
+    distinct source across `workers` processes. Returns one result dict
+    per pair, in order, with the keys in FIELDS.
+    """
+    degrees.load_data(directory, snapshot=True)
+
+    results = []
+    jobs = defaultdict(set)
+    for source_name, target_name in pairs:
+        source, source_status = resolve(source_name)
+        target, target_status = resolve(target_name)
+        result = {
+            "source": source_name,
+            "target": target_name,
+            "source_id": source,
+            "target_id": target,
+            "status": source_status or target_status,
+            "degrees": None,
+            "path": None,
+        }
+        results.append(result)
+        if result["status"] is None:
+            jobs[source].add(target)
+
+    jobs = [(source, list(targets)) for source, targets in jobs.items()]
+    if workers == 1:
+        answers = dict(map(solve_source, jobs))
+    else:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(directory,)
+        ) as executor:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            answers = dict(executor.map(solve_source, jobs, chunksize=chunksize))
+
+    for result in results:
+        if result["status"] is not None:
+            continue
+        path = answers[result["source_id"]][result["target_id"]]
+        if path is None:
+            result["status"] = "not connected"
+        else:
+            result["status"] = "ok"
+            result["degrees"] = len(path)
+            result["path"] = path
+    return results
+
+
+def write_results(results, filename):
+    """
+    Write results as JSON lines if `filename` ends in .jsonl,
+    otherwise as CSV with the path JSON-encoded.
+    """
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        if filename.endswith(".jsonl"):
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+            return
+
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for result in results:
+            row = dict(result)
+            if row["path"] is not None:
+                row["path"] = json.dumps(row["path"])
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer degrees of separation for many name pairs"
+    )
+    parser.add_argument("pairs", help="CSV file with source,target columns")
+    parser.add_argument("output", help="results file (.csv or .jsonl)")
+    parser.add_argument("--directory", default="small")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    results = run_batch(args.directory, read_pairs(args.pairs), args.workers)
+    write_results(results, args.output)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import random
+import tracemalloc
+from time import perf_counter
+
+import degrees
+from generate import generate
+from instrument import Recorder
+
+
+def reset():
+    """
+    Drop any data loaded by a previous run.
+    """
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.graph = None
+
+
+def person_ids():
+    if degrees.graph is not None:
+        return list(degrees.graph.person_ids)
+    return list(degrees.people)
+
+
+def random_pairs(pairs, seed):
+    ids = person_ids()
+    rng = random.Random(seed)
+    return [(rng.choice(ids), rng.choice(ids)) for _ in range(pairs)]
+
+
+# Keyword arguments to load_data for each layout
+LAYOUTS = {
+    "dict": {},
+    "csr": {"compact": True},
+    "snapshot": {"snapshot": True},
+}
+
+# Keyword arguments to shortest_path for each search compared
+SEARCHES = {
+    "bfs-pairs": {"strategy": "bfs", "hyperedges": False},
+    "bfs": {"strategy": "bfs"},
+    "bidirectional-pairs": {"strategy": "bidirectional", "hyperedges": False},
+    "bidirectional": {"strategy": "bidirectional"},
+    "astar": {"strategy": "astar"},
+}
+
+# Landmarks loaded for the A* comparison
+NUM_LANDMARKS = 8
+
+
+def measure_layout(directory, layout, pairs, chunk_rows=None, seed=0):
+    """
+    Load `directory` in one layout and time `pairs` random queries.
+    Returns a dict of memory (bytes) and latency (seconds) figures,
+    where `peak` is the high-water mark of allocations during loading.
+    """
+    if layout == "snapshot":
+        # Make sure the snapshot exists so only the warm start is timed
+        degrees.load_data(directory, chunk_rows=chunk_rows, **LAYOUTS[layout])
+
+    reset()
+    stats = {}
+    tracemalloc.start()
+    degrees.load_data(
+        directory, chunk_rows=chunk_rows, stats=stats, **LAYOUTS[layout]
+    )
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ids = person_ids()
+    start = perf_counter()
+    for person_id in ids:
+        degrees.neighbors_for_person(person_id)
+    neighbors_time = perf_counter() - start
+
+    start = perf_counter()
+    for source, target in random_pairs(pairs, seed):
+        degrees.shortest_path(source, target)
+    query_time = perf_counter() - start
+
+    return {
+        "layout": layout,
+        "memory": memory,
+        "peak": peak,
+        "load": stats["load_time"],
+        "neighbors": neighbors_time / max(len(ids), 1),
+        "query": query_time / max(pairs, 1),
+    }
+
+
+def compare_searches(pairs, searches=SEARCHES, seed=0):
+    """
+    Run each search on the same random pairs over the currently loaded
+    data. Returns the Recorder summary of each search's counters, plus
+    the peak bytes allocated while searching.
+    """
+    queries = random_pairs(pairs, seed)
+    recorder = Recorder()
+    results = {}
+    try:
+        for name, options in searches.items():
+            recorder.clear()
+            degrees.search_hook = recorder
+            for source, target in queries:
+                degrees.shortest_path(source, target, **options)
+            degrees.search_hook = None
+            results[name] = recorder.summary()
+
+            # Measure allocations in a separate pass so tracing does not
+            # distort the timings above
+            tracemalloc.start()
+            for source, target in queries:
+                degrees.shortest_path(source, target, **options)
+            results[name]["peak"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        degrees.search_hook = None
+    return results
+
+
+def run_suite(directory, pairs, chunk_rows=None, seed=0):
+    """
+    Benchmark every layout and search on one dataset.
+    """
+    layouts = [
+        measure_layout(directory, layout, pairs, chunk_rows, seed)
+        for layout in LAYOUTS
+    ]
+
+    stats = {}
+    degrees.load_data(
+        directory, snapshot=True, num_landmarks=NUM_LANDMARKS, stats=stats
+    )
+    return {
+        "directory": directory,
+        "pairs": pairs,
+        "seed": seed,
+        "people": degrees.graph.num_people,
+        "movies": degrees.graph.num_movies,
+        "landmark_time": stats["landmark_time"],
+        "layouts": layouts,
+        "searches": compare_searches(pairs, seed=seed),
+    }
+
+
+def print_suite(result):
+    print(f"{result['directory']}: {result['people']} people, "
+          f"{result['movies']} movies")
+    print(f"{'layout':<10}{'memory MB':>12}{'peak MB':>12}{'load s':>10}"
+          f"{'neighbors us':>15}{'query ms':>12}")
+    for layout in result["layouts"]:
+        print(f"{layout['layout']:<10}"
+              f"{layout['memory'] / 1e6:>12.2f}"
+              f"{layout['peak'] / 1e6:>12.2f}"
+              f"{layout['load']:>10.3f}"
+              f"{layout['neighbors'] * 1e6:>15.1f}"
+              f"{layout['query'] * 1e3:>12.3f}")
+
+    print()
+    print(f"{'search':<22}{'expanded':>10}{'frontier':>10}{'explored':>10}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for name, summary in result["searches"].items():
+        print(f"{name:<22}"
+              f"{summary['expanded']['mean']:>10.1f}"
+              f"{summary['frontier_peak']['mean']:>10.1f}"
+              f"{summary['explored']['mean']:>10.1f}"
+              f"{summary['time']['p50'] * 1e3:>10.3f}"
+              f"{summary['time']['p99'] * 1e3:>10.3f}"
+              f"{summary['peak'] / 1e6:>10.3f}")
+    print()
+
+
+def synthetic_dataset(people, seed=0):
+    """
+    Returns the name of a synthetic dataset with `people` people,
+    generating it under degrees/ the first time it is asked for.
+    """
+    directory = f"synthetic-{people}-{seed}"
+    if not os.path.exists(f"degrees/{directory}/stars.csv"):
+        print(f"Generating {directory}...")
+        generate(f"degrees/{directory}", people, seed=seed)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark degrees data layouts and searches"
+    )
+    parser.add_argument("directories", nargs="*")
+    parser.add_argument("--synthetic", type=int, nargs="+", default=[],
+                        metavar="PEOPLE",
+                        help="also benchmark generated datasets of these sizes")
+    parser.add_argument("--pairs", type=int, default=20,
+                        help="random queries per layout and search")
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the results to FILE as JSON")
+    args = parser.parse_args()
+
+    directories = args.directories
+    directories += [synthetic_dataset(n, args.seed) for n in args.synthetic]
+    if not directories:
+        directories = ["small"]
+
+    results = []
+    for directory in directories:
+        result = run_suite(directory, args.pairs, args.chunk_rows, args.seed)
+        print_suite(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
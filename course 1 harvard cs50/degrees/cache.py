@@ -0,0 +1,159 @@
+from collections import OrderedDict, deque
+
+
+class QueryCache():
+    """
+    Bounded LRU cache of shortest paths keyed by unordered person pairs.
+
+    Besides whole answers, it keeps up to `max_trees` breadth-first
+    trees for people that keep showing up in misses: once a person is
+    part of `tree_threshold` of the last `miss_window` misses,
+    `build_tree(person_id)` is called and must return a function mapping
+    any target to its shortest path from that person (or None). Any
+    later query touching that person is then answered by walking the
+    tree. A tree costs far more than one search, so the threshold should
+    only be reached by people who are queried again and again.
+    """
+
+    def __init__(self, build_tree, max_paths=1024, max_trees=4,
+                 tree_threshold=8, miss_window=256):
+        self.build_tree = build_tree
+        self.max_paths = max_paths
+        self.max_trees = max_trees
+        self.tree_threshold = tree_threshold
+
+        # (person_id, person_id) in sorted order -> path from the first
+        self.paths = OrderedDict()
+
+        # person_id -> function returning paths from that person
+        self.trees = OrderedDict()
+
+        # The people of the last `miss_window` misses, and how many of
+        # those misses each of them was part of
+        self.recent_misses = deque(maxlen=miss_window)
+        self.misses_by_person = {}
+
+        self.hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.trees_built = 0
+        self.tree_evictions = 0
+
+    def clear(self):
+        self.paths.clear()
+        self.trees.clear()
+        self.recent_misses.clear()
+        self.misses_by_person.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "tree_hits": self.tree_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "trees_built": self.trees_built,
+            "tree_evictions": self.tree_evictions,
+            "paths": len(self.paths),
+            "trees": len(self.trees),
+        }
+
+    def get(self, source, target):
+        """
+        Returns (True, path) for a cached answer from `source` to
+        `target`, or (False, None) if it has to be searched for.
+        """
+        key, flipped = pair_key(source, target)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            path = self.paths[key]
+            if flipped:
+                path = reverse_path(target, path)
+            return True, path
+
+        found, path = self.from_tree(source, target)
+        if found:
+            self.tree_hits += 1
+            return True, path
+        self.misses += 1
+        return False, None
+
+    def record_miss(self, source, target):
+        """
+        Count a miss returned by get. Returns (True, path) if it pushed
+        either person over the threshold, in which case the tree just
+        built already holds the answer, or (False, None) otherwise.
+        """
+        for person_id in {source, target}:
+            self.count_miss(person_id)
+        return self.from_tree(source, target)
+
+    def from_tree(self, source, target):
+        for root, other in ((source, target), (target, source)):
+            if root in self.trees:
+                self.trees.move_to_end(root)
+                path = self.trees[root](other)
+                if root == target:
+                    path = reverse_path(target, path)
+                self.put(source, target, path)
+                return True, path
+        return False, None
+
+    def put(self, source, target, path):
+        key, flipped = pair_key(source, target)
+        if flipped:
+            path = reverse_path(source, path)
+        self.paths[key] = path
+        self.paths.move_to_end(key)
+        while len(self.paths) > self.max_paths:
+            self.paths.popitem(last=False)
+            self.evictions += 1
+
+    def count_miss(self, person_id):
+        """
+        Count a miss for one person, building their tree once they
+        reach the threshold within the window.
+        """
+        if self.max_trees <= 0 or person_id in self.trees:
+            return
+        counts = self.misses_by_person
+        if len(self.recent_misses) == self.recent_misses.maxlen:
+            oldest = self.recent_misses[0]
+            counts[oldest] -= 1
+            if counts[oldest] == 0:
+                del counts[oldest]
+        self.recent_misses.append(person_id)
+        counts[person_id] = counts.get(person_id, 0) + 1
+        if counts[person_id] < self.tree_threshold:
+            return
+
+        self.trees[person_id] = self.build_tree(person_id)
+        self.trees_built += 1
+        while len(self.trees) > self.max_trees:
+            self.trees.popitem(last=False)
+            self.tree_evictions += 1
+
+
+def pair_key(source, target):
+    """
+    Returns the unordered cache key for a pair and whether the pair
+    is stored the other way round.
+    """
+    if source <= target:
+        return (source, target), False
+    return (target, source), True
+
+
+def reverse_path(source, path):
+    """
+    Returns the path from the last person of `path` back to `source`,
+    where `path` is a list of (movie_id, person_id) pairs from `source`.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for _, person_id in path]
+    result = []
+    for i in range(len(path) - 1, -1, -1):
+        result.append((path[i][0], people[i]))
+    return result
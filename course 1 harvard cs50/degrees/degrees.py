@@ -1,7 +1,19 @@
+import argparse
 import csv
 import sys
-
-from util import Node, StackFrontier, QueueFrontier
+from time import perf_counter
+
+from cache import QueryCache
+from graph import Graph
+from snapshot import load_graph
+from landmarks import load_landmarks
+from nameindex import NameIndex
+from search import (
+    astar_search, bidirectional_search, breadth_first_search,
+    breadth_first_tree, path_in_tree, record, shortest_paths
+)
+from search import k_shortest_paths as search_k_shortest_paths
+from util import IndexSet
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,13 +24,72 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Sorted index over `names` for prefix and fuzzy lookups
+name_index = None
+
+# Compact integer-indexed graph, used instead of the dicts above
+# when data is loaded with compact=True
+graph = None
+
+# Optional LandmarkIndex over `graph`, used to guide and prune searches
+landmarks = None
 
+# Optional QueryCache of recent answers, see enable_cache
+cache = None
 
+# Optional function called with the stats dict of every shortest_path
+search_hook = None
 
-def load_data(directory):
+
+def load_data(directory, compact=False, snapshot=False, chunk_rows=None,
+              num_landmarks=0, stats=None):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the data is stored as a CSR `Graph` rather than
+    in the `names`, `people` and `movies` dicts. With `snapshot`, the
+    compact graph is memory-mapped from a binary snapshot next to the
+    CSV files, which is written on first use and whenever they change.
+    The compact graph is parsed `chunk_rows` CSV rows at a time.
+
+    With `num_landmarks`, a landmark distance index over the compact
+    graph is loaded from (or built and saved next to) the CSV files.
+
+    If `stats` is given, the seconds spent loading the graph and the
+    landmarks are stored in it as "load_time" and "landmark_time".
+    """
+    global landmarks
+    start = perf_counter()
+    load_layout(directory, compact, snapshot, chunk_rows)
+    if stats is not None:
+        stats["load_time"] = perf_counter() - start
+
+    landmarks = None
+    if num_landmarks:
+        if graph is None:
+            raise ValueError("landmarks require the compact graph")
+        start = perf_counter()
+        landmarks = load_landmarks(graph, f"degrees/{directory}", num_landmarks)
+        if stats is not None:
+            stats["landmark_time"] = perf_counter() - start
+
+
+def load_layout(directory, compact, snapshot, chunk_rows):
+    """
+    Load the graph in the layout chosen by `load_data`.
     """
+    global graph, name_index
+    name_index = None
+    if cache is not None:
+        cache.clear()
+    if snapshot:
+        graph = load_graph(f"degrees/{directory}", chunk_rows=chunk_rows)
+        return
+    if compact:
+        graph = Graph.from_csv(f"degrees/{directory}", chunk_rows=chunk_rows)
+        return
+    graph = None
+
     # Load people
     with open(f"degrees/{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -53,17 +124,65 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    name_index = NameIndex.from_names(
+        names, lambda person_id: len(people[person_id]["movies"])
+    )
+
+
+def person(person_id):
+    """
+    Returns the name, birth and movies of a person in either layout.
+    """
+    if graph is not None:
+        return graph.person(person_id)
+    return people[person_id]
+
+
+def movie(movie_id):
+    """
+    Returns the title, year and stars of a movie in either layout.
+    """
+    if graph is not None:
+        return graph.movie(movie_id)
+    return movies[movie_id]
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "small"
+    parser = argparse.ArgumentParser(description="Degrees of separation")
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph as integer-indexed CSR arrays")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load the compact graph from a cached snapshot")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="load an index of K landmark people for "
+                             "--strategy astar (implies --compact)")
+    parser.add_argument("--strategy", default=None,
+                        choices=("bfs", "bidirectional", "astar"),
+                        help="search strategy (default: bidirectional)")
+    parser.add_argument("--components", action="store_true",
+                        help="print connected component statistics and exit")
+    args = parser.parse_args()
+    if args.strategy == "astar" and args.landmarks <= 0:
+        parser.error("--strategy astar needs --landmarks K")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    compact = args.compact or args.components or args.landmarks > 0
+    load_data(args.directory, compact=compact, snapshot=args.snapshot,
+              num_landmarks=args.landmarks)
     print("Data loaded.")
 
+    if args.components:
+        stats = graph.component_stats()
+        print(f"Components: {stats['components']}")
+        print(f"Largest: {stats['largest']} people "
+              f"({stats['largest_share']:.1%})")
+        print(f"Isolated people: {stats['singletons']}")
+        for size, count in stats["histogram"].items():
+            print(f"  size {size}: {count}")
+        return
+
     keep_going = True
     isOk1 = False
     isOk2 = False
@@ -82,7 +201,7 @@ def main():
             else:
                 isOk2 = True
 
-        path = shortest_path(source, target)
+        path = shortest_path(source, target, strategy=args.strategy)
 
         if path is None:
             print("Not connected.")
@@ -91,11 +210,11 @@ def main():
             print(f"{degrees} degrees of separation.")
             path = [(None, source)] + path
             for i in range(degrees):
-                person1 = people[path[i][1]]["name"]
-                person2 = people[path[i + 1][1]]["name"]
-                movie = movies[path[i + 1][0]]["title"]
-                year = movies[path[i + 1][0]]["year"]
-                print(f"{i + 1}: {person1} and {person2} starred in {movie}, {year}")
+                person1 = person(path[i][1])["name"]
+                person2 = person(path[i + 1][1])["name"]
+                title = movie(path[i + 1][0])["title"]
+                year = movie(path[i + 1][0])["year"]
+                print(f"{i + 1}: {person1} and {person2} starred in {title}, {year}")
 
         user_input = input("Do you want to do another one?(y/n) ")
         if user_input.startswith("n") or user_input.startswith("N"):
@@ -105,66 +224,283 @@ def main():
             isOk2 = False
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, strategy=None, stats=None,
+                  hyperedges=True):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    Answers come from the query cache when it is enabled; otherwise
+    see `find_path` for the options. If `stats` is given, or a
+    `search_hook` is installed, the search counters are stored in it
+    along with the total time and whether the cache answered. A miss
+    answered by the tree it caused to be built does not count as cached.
+    """
+    if stats is None and search_hook is not None:
+        stats = {}
+    start = perf_counter()
+
+    cached = found = False
+    if cache is not None:
+        cached, path = cache.get(source, target)
+        found = cached
+        if not found:
+            found, path = cache.record_miss(source, target)
+    if not found:
+        path = find_path(source, target, strategy, stats, hyperedges)
+        if cache is not None:
+            cache.put(source, target, path)
+
+    if stats is not None:
+        stats["time"] = perf_counter() - start
+        stats["cached"] = cached
+    if search_hook is not None:
+        search_hook(stats)
+    return path
+
+
+def enable_cache(max_paths=1024, max_trees=4, tree_threshold=8,
+                 miss_window=256):
+    """
+    Cache the answers of up to `max_paths` recent queries and the
+    breadth-first trees of up to `max_trees` people who have been part
+    of `tree_threshold` of the last `miss_window` misses. Pass
+    max_paths=0 to disable.
+    """
+    global cache
+    if max_paths <= 0:
+        cache = None
+        return
+    cache = QueryCache(
+        path_tree, max_paths, max_trees, tree_threshold, miss_window
+    )
+
+
+def find_path(source, target, strategy=None, stats=None, hyperedges=True):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, or None, without
+    consulting the cache.
+
+    `strategy` is one of "bfs" (one-sided breadth-first search),
+    "bidirectional" (search from both people and meet in the middle)
+    or "astar" (guided by the landmark index, which must be loaded). It
+    defaults to "bidirectional", which expands far fewer people than
+    A* with landmarks on the datasets benchmark.py measures.
+
+    With `hyperedges`, breadth-first strategies expand each movie only
+    once per search instead of listing every co-star pair.
+    """
+    if strategy is None:
+        strategy = "bidirectional"
+
+    if graph is None:
+        if strategy not in ("bfs", "bidirectional"):
+            raise ValueError(
+                f"unsupported strategy for dict layout: {strategy}"
+            )
+        if hyperedges:
+            forward, backward = movie_expander(), movie_expander()
+        else:
+            forward = backward = neighbors_for_person
+        if strategy == "bidirectional":
+            return bidirectional_search(
+                source, target, forward, stats=stats,
+                backward_neighbors=backward
+            )
+        return breadth_first_search(source, target, forward, stats=stats)
+
+    # Search over person numbers and translate the path back to ids
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        record(stats, 0, 0, 0, 0.0)
+        return None
+    if hyperedges:
+        forward, backward = graph.expander(), graph.expander()
+    else:
+        forward = backward = graph.neighbors
+    if strategy == "bidirectional":
+        path = bidirectional_search(
+            source, target, forward, stats=stats,
+            backward_neighbors=backward
+        )
+    elif strategy == "bfs":
+        path = breadth_first_search(
+            source, target, forward, stats=stats,
+            explored=IndexSet(graph.num_people)
+        )
+    elif strategy == "astar":
+        # A* does not expand people in distance order, so a movie
+        # reached first is not necessarily reached at its best cost
+        if landmarks is None:
+            raise ValueError("astar requires a landmark index")
+        path = astar_search(
+            source, target, graph.neighbors, landmarks.heuristic(target),
+            stats=stats
+        )
+    else:
+        raise ValueError(f"unknown strategy: {strategy}")
+    if path is None:
+        return None
+
+    start = perf_counter()
+    path = person_path(path)
+    if stats is not None:
+        stats["path_time"] += perf_counter() - start
+    return path
+
+
+def paths_from(source, targets):
+    """
+    Returns a dict mapping each of `targets` to the shortest list of
+    (movie_id, person_id) pairs that connect the source to it, or None
+    if not connected, using a single search from the source.
+    """
+    if graph is None:
+        parents = breadth_first_tree(source, movie_expander(), targets)
+        return {target: path_in_tree(parents, target) for target in targets}
+
+    index = graph.person_index
+    parents = breadth_first_tree(
+        index[source], graph.expander(),
+        [index[target] for target in targets],
+        explored=IndexSet(graph.num_people)
+    )
+    result = {}
+    for target in targets:
+        path = path_in_tree(parents, index[target])
+        result[target] = None if path is None else person_path(path)
+    return result
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns the number of distinct shortest lists of (movie_id,
+    person_id) pairs that connect the source to the target, without
+    listing them.
     """
-    frontier = QueueFrontier()
-    start = Node(state= source,parent=None,action=None)
-    frontier.add(start)
-    explored = []
-    movie_list = []
-    i = 0
-    while True:
-        i+=1
-       
-        
-        
-        node = frontier.remove()
-        
-        explored.append(int(node.state))
-        
-        
-        if node.state == target:
-            # print(f"made it + {node.state} + {node.parent.state}")
-            combined = []
-            while node.parent != None:
-                combined.append((node.action, node.state))
-                node = node.parent
-
-            
-            combined = combined[::-1]
-            print(combined)
-            return combined
-        
-
-        
-        stars = list(neighbors_for_person(node.state))
-        for movie,star in stars:
-            if int(star) == node.state:
-                stars = stars.pop(stars.index(star))
-
-           
-                
-
-
-        for movie,star in stars:
-            
-            if int(star) not in explored:
-                new_star = Node(state=star,parent = node, action = movie)  
-                frontier.add(new_star)
-            
-        if frontier.empty():
-             return None
-        print(i)
-        
-
-
-    # TODO
-    raise NotImplementedError
+    dag = shortest_path_dag(source, target)
+    return 0 if dag is None else dag.count
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+    """
+    dag = shortest_path_dag(source, target)
+    if dag is None:
+        return
+    for path in dag:
+        yield person_path(path)
+
+
+def k_shortest_paths(source, target, k):
+    """
+    Lazily yields up to `k` simple lists of (movie_id, person_id) pairs
+    that connect the source to the target, shortest first.
+    """
+    if graph is None:
+        yield from search_k_shortest_paths(
+            source, target, neighbors_for_person, k
+        )
+        return
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return
+    for path in search_k_shortest_paths(source, target, graph.neighbors, k):
+        yield person_path(path)
+
+
+def shortest_path_dag(source, target):
+    """
+    Returns the ShortestPaths layering between two people in the
+    current layout, or None if they are not connected.
+    """
+    if graph is None:
+        return shortest_paths(source, target, neighbors_for_person)
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return None
+    return shortest_paths(source, target, graph.neighbors)
+
+
+def person_path(path):
+    """
+    Translates a path found over the compact graph's person and movie
+    numbers into (movie_id, person_id) pairs; dict layout paths are
+    returned unchanged.
+    """
+    if graph is None:
+        return path
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def path_tree(source):
+    """
+    Runs one breadth-first search from `source` over its whole
+    component and returns a function mapping any target to the
+    shortest list of (movie_id, person_id) pairs from the source,
+    or None if not connected.
+    """
+    if graph is None:
+        parents = breadth_first_tree(source, movie_expander())
+        return lambda target: path_in_tree(parents, target)
+
+    parents, links = graph.tree(graph.person_index[source])
+    root = graph.person_index[source]
+
+    def path_to(target):
+        person = graph.person_index[target]
+        if person != root and parents[person] == -1:
+            return None
+        path = []
+        while person != root:
+            path.append((graph.movie_ids[links[person]],
+                         graph.person_ids[person]))
+            person = parents[person]
+        path.reverse()
+        return path
+
+    return path_to
+
+
+def person_ids_for_name(name):
+    """
+    Returns the IMDB ids of everyone with a given name, most popular
+    (by number of movies) first, without prompting.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return name_index.exact(name)
+
+
+def complete_name(prefix, limit=10):
+    """
+    Returns the IMDB ids of up to `limit` people whose name starts
+    with `prefix`, most popular first.
+    """
+    if graph is not None:
+        people = graph.name_index.prefix(prefix, limit)
+        return [graph.person_ids[p] for p in people]
+    return name_index.prefix(prefix, limit)
+
+
+def match_name(name, max_distance=2, limit=10):
+    """
+    Returns up to `limit` (person_id, distance) pairs for people whose
+    name is within `max_distance` edits of `name`, closest and then
+    most popular first.
+    """
+    if graph is not None:
+        matches = graph.name_index.fuzzy(name, max_distance, limit)
+        return [(graph.person_ids[p], distance) for p, distance in matches]
+    return name_index.fuzzy(name, max_distance, limit)
 
 
 def person_id_for_name(name):
@@ -172,15 +508,15 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            record = person(person_id)
+            name = record["name"]
+            birth = record["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -198,6 +534,14 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        ids = graph.person_ids
+        movie_ids = graph.movie_ids
+        return {
+            (movie_ids[m], ids[p])
+            for m, p in graph.neighbors(graph.person_index[person_id])
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -206,5 +550,29 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def movie_expander():
+    """
+    Returns a neighbors function for a single breadth-first search that
+    treats each movie as a hyperedge: it yields (movie_id, person_id)
+    pairs for the co-stars of a person, skipping the person themselves
+    and any movie it has already expanded.
+
+    In breadth-first order the first person to reach a movie is at the
+    smallest distance, so expanding it again can never shorten a path.
+    """
+    expanded = set()
+
+    def expand(person_id):
+        for movie_id in people[person_id]["movies"]:
+            if movie_id in expanded:
+                continue
+            expanded.add(movie_id)
+            for star_id in movies[movie_id]["stars"]:
+                if star_id != person_id:
+                    yield movie_id, star_id
+
+    return expand
+
+
 if __name__ == "__main__":
     main()
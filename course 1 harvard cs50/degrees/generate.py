@@ -0,0 +1,180 @@
+import argparse
+import csv
+import os
+import random
+from array import array
+from bisect import bisect_right, insort
+from itertools import accumulate
+
+FIRST_NAMES = (
+    "Ada", "Alan", "Alice", "Amy", "Anna", "Ben", "Carl", "Clara", "Dan",
+    "Diana", "Ed", "Ella", "Emma", "Frank", "Grace", "Hana", "Ian", "Ivy",
+    "Jack", "Jane", "Joan", "John", "Kate", "Leo", "Lily", "Lucy", "Mark",
+    "Mary", "Max", "Mia", "Nina", "Noah", "Omar", "Paul", "Rita", "Rose",
+    "Ruth", "Sam", "Sara", "Tom", "Uma", "Vera", "Will", "Zoe",
+)
+
+LAST_NAMES = (
+    "Adams", "Baker", "Brown", "Clark", "Cole", "Cruz", "Davis", "Evans",
+    "Fox", "Green", "Gray", "Hall", "Hill", "Hunt", "Jones", "Kent", "King",
+    "Lee", "Lopez", "Moore", "Nash", "Owen", "Park", "Price", "Reed", "Ross",
+    "Scott", "Shaw", "Smith", "Stone", "Tate", "Turner", "Wade", "Walsh",
+    "Ward", "West", "White", "Wood", "Young",
+)
+
+TITLE_WORDS = (
+    "Silent", "Red", "Last", "Lost", "Broken", "Golden", "Midnight", "Wild",
+    "Hidden", "Final", "River", "Star", "Night", "City", "Storm", "Heart",
+    "Road", "Shadow", "Garden", "Empire", "Fire", "Island", "Dream", "Winter",
+)
+
+# Co-star degree is proportional to a Pareto-distributed popularity
+PERSON_EXPONENT = 1.5
+
+# Cast sizes follow a power law truncated to [1, MAX_CAST]
+CAST_EXPONENT = 2.0
+MAX_CAST = 200
+
+# Share of people with no birth year on record
+MISSING_BIRTH = 0.1
+
+
+def cast_size_weights(exponent, max_cast):
+    """
+    Returns cumulative weights for cast sizes 1..max_cast where size
+    s is drawn with probability proportional to s ** -exponent.
+    """
+    return list(accumulate(
+        size ** -exponent for size in range(1, max_cast + 1)
+    ))
+
+
+def person_name(rng):
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    if rng.random() < 0.5:
+        return f"{first} {chr(rng.randrange(65, 91))}. {last}"
+    return f"{first} {last}"
+
+
+def movie_title(rng):
+    words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+    title = " ".join(words)
+    if rng.random() < 0.2:
+        title += f" {rng.randint(2, 5)}"
+    return title
+
+
+def generate(directory, num_people, num_movies=None, seed=0,
+             person_exponent=PERSON_EXPONENT, cast_exponent=CAST_EXPONENT,
+             max_cast=MAX_CAST):
+    """
+    Write a synthetic people.csv, movies.csv and stars.csv into
+    `directory`, in the same format as the shipped datasets.
+
+    Every person gets a popularity drawn from a Pareto distribution and
+    movies cast people with probability proportional to it, so co-star
+    degrees are heavy-tailed like the real data. The same seed always
+    produces the same files. Returns the number of stars rows.
+    """
+    if num_people < 1:
+        raise ValueError("need at least one person")
+    if num_movies is None:
+        num_movies = max(1, num_people // 3)
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    # Person 1 is the best known, so there is always a "Kevin Bacon"
+    popularity = array("d", (
+        rng.paretovariate(person_exponent) for _ in range(num_people)
+    ))
+    popularity[0] = max(popularity)
+    cumulative = array("d", accumulate(popularity))
+    total = cumulative[-1]
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("id", "name", "birth"))
+        for person in range(num_people):
+            name = "Kevin Bacon" if person == 0 else person_name(rng)
+            birth = ""
+            if rng.random() >= MISSING_BIRTH:
+                birth = rng.randint(1900, 2010)
+            writer.writerow((person + 1, name, birth))
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("id", "title", "year"))
+        for movie in range(num_movies):
+            writer.writerow((movie + 1, movie_title(rng),
+                             rng.randint(1920, 2025)))
+
+    weights = cast_size_weights(cast_exponent, min(max_cast, num_people))
+    sizes = array("i", (
+        bisect_right(weights, rng.random() * weights[-1]) + 1
+        for _ in range(num_movies)
+    ))
+
+    # Everyone is credited at least once, like the real data: each cast
+    # slot goes to the next newcomer with the share of the remaining
+    # slots that newcomers still need, and to a person picked by
+    # popularity otherwise
+    newcomers = array("i", range(num_people))
+    rng.shuffle(newcomers)
+    debuts = 0
+    slots = sum(sizes)
+
+    rows = 0
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("person_id", "movie_id"))
+        for movie, size in enumerate(sizes):
+            cast = []
+            while len(cast) < size:
+                if (debuts < num_people
+                        and rng.random() * slots < num_people - debuts):
+                    person = newcomers[debuts]
+                    debuts += 1
+                else:
+                    person = bisect_right(cumulative, rng.random() * total)
+                    person = min(person, num_people - 1)
+                if person not in cast:
+                    insort(cast, person)
+                    slots -= 1
+            writer.writerows((person + 1, movie + 1) for person in cast)
+            rows += size
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic degrees dataset"
+    )
+    parser.add_argument("directory",
+                        help="dataset name, written under degrees/")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=None,
+                        help="number of movies (default: a third of people)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--person-exponent", type=float,
+                        default=PERSON_EXPONENT,
+                        help="Pareto shape of person popularity")
+    parser.add_argument("--cast-exponent", type=float, default=CAST_EXPONENT,
+                        help="power-law exponent of cast sizes")
+    parser.add_argument("--max-cast", type=int, default=MAX_CAST)
+    args = parser.parse_args()
+
+    rows = generate(
+        f"degrees/{args.directory}", args.people, args.movies, args.seed,
+        args.person_exponent, args.cast_exponent, args.max_cast
+    )
+    print(f"Wrote {args.people} people, "
+          f"{args.movies or max(1, args.people // 3)} movies, "
+          f"{rows} stars to degrees/{args.directory}")
+
+
+if __name__ == "__main__":
+    main()
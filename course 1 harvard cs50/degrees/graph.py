@@ -0,0 +1,438 @@
+import csv
+from array import array
+from itertools import islice
+from operator import itemgetter
+from sys import intern
+
+from nameindex import NameIndex
+
+# Number of CSV rows parsed per chunk while loading
+CHUNK_ROWS = 65536
+
+# Distance stored for people a search cannot reach
+UNREACHABLE = -1
+
+
+class Graph():
+    """
+    Compact, integer-indexed star graph.
+
+    People and movies are numbered densely from 0 in file order. The
+    bipartite person <-> movie edges are stored in CSR form once per side:
+    the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the stars
+    of movie `m` are laid out the same way in `movie_offsets`/`movie_stars`.
+    """
+
+    def __init__(self):
+
+        # Per-person columns, indexed by person number
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+
+        # Per-movie columns, indexed by movie number
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # Maps IMDB ids to person / movie numbers
+        self.person_index = {}
+        self.movie_index = {}
+
+        # Sorted lowercase name index over person numbers
+        self.name_index = None
+
+        # CSR adjacency for both sides of the bipartite graph
+        self.person_offsets = array("i", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("i", [0])
+        self.movie_stars = array("i")
+
+        # Connected component number of each person
+        self.components = array("i")
+
+        # Memory-mapped snapshot backing the arrays, if loaded from one
+        self.buffer = None
+
+    @classmethod
+    def from_csv(cls, directory, chunk_rows=None):
+        """
+        Load a graph from the people, movies and stars CSV files
+        in `directory`.
+
+        Rows are streamed `chunk_rows` at a time and appended straight
+        into the graph's columns, so only one chunk of parsed rows is
+        alive at any point.
+        """
+        graph = cls()
+        chunk_rows = chunk_rows or CHUNK_ROWS
+
+        path = f"{directory}/people.csv"
+        for chunk in read_chunks(path, ("id", "name", "birth"), chunk_rows):
+            for person_id, name, birth in chunk:
+                graph.add_person(person_id, name, intern(birth))
+
+        path = f"{directory}/movies.csv"
+        for chunk in read_chunks(path, ("id", "title", "year"), chunk_rows):
+            for movie_id, title, year in chunk:
+                graph.add_movie(movie_id, title, intern(year))
+
+        # Collect edges as two parallel columns, skipping unknown ids
+        person_index = graph.person_index
+        movie_index = graph.movie_index
+        edge_people = array("i")
+        edge_movies = array("i")
+        path = f"{directory}/stars.csv"
+        for chunk in read_chunks(path, ("person_id", "movie_id"), chunk_rows):
+            for person_id, movie_id in chunk:
+                person = person_index.get(person_id)
+                movie = movie_index.get(movie_id)
+                if person is None or movie is None:
+                    continue
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        graph.build(edge_people, edge_movies)
+        graph.index_names()
+        return graph
+
+    def add_person(self, person_id, name, birth):
+        """
+        Register a person and return their number. A repeated id
+        replaces the earlier row and keeps its number, as in the dict
+        layout.
+        """
+        person = self.person_index.get(person_id)
+        if person is not None:
+            self.person_names[person] = name
+            self.person_births[person] = birth
+            return person
+        person = len(self.person_ids)
+        self.person_index[person_id] = person
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        return person
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Register a movie and return its number. A repeated id replaces
+        the earlier row and keeps its number.
+        """
+        movie = self.movie_index.get(movie_id)
+        if movie is not None:
+            self.movie_titles[movie] = title
+            self.movie_years[movie] = year
+            return movie
+        movie = len(self.movie_ids)
+        self.movie_index[movie_id] = movie
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        return movie
+
+    def build(self, edge_people, edge_movies):
+        """
+        Build both CSR sides from parallel arrays of (person, movie) edges
+        and label connected components. Repeated edges are kept once, as
+        the sets of the dict layout keep them.
+        """
+        edge_people, edge_movies = unique_edges(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.person_offsets, self.person_movies = csr(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_stars = csr(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+        self.label_components()
+
+    def index_names(self):
+        """
+        Build the name index, ranking people by number of movies.
+        """
+        names = {}
+        for person, name in enumerate(self.person_names):
+            names.setdefault(name.lower(), []).append(person)
+        self.name_index = NameIndex.from_names(names, self.popularity)
+
+    def popularity(self, person):
+        """
+        Returns the number of movies a person starred in.
+        """
+        return self.person_offsets[person + 1] - self.person_offsets[person]
+
+    def label_components(self):
+        """
+        Number the connected components of the person graph densely
+        from 0 in order of their first person, using union-find over
+        each movie's cast.
+        """
+        size = self.num_people
+        parent = array("i", range(size))
+
+        def find(person):
+            while parent[person] != person:
+                parent[person] = parent[parent[person]]
+                person = parent[person]
+            return person
+
+        for movie in range(self.num_movies):
+            stars = self.stars_of(movie)
+            if len(stars) < 2:
+                continue
+            root = find(stars[0])
+            for star in stars[1:]:
+                other = find(star)
+                if other != root:
+                    parent[other] = root
+
+        labels = array("i", [-1]) * size
+        components = array("i", [0]) * size
+        count = 0
+        for person in range(size):
+            root = find(person)
+            if labels[root] == -1:
+                labels[root] = count
+                count += 1
+            components[person] = labels[root]
+        self.components = components
+
+    def connected(self, person, other):
+        """
+        Returns True if there is any path between two people.
+        """
+        return self.components[person] == self.components[other]
+
+    def component_sizes(self):
+        """
+        Returns an array holding the number of people in each component.
+        """
+        sizes = array("i")
+        for component in self.components:
+            if component == len(sizes):
+                sizes.append(0)
+            sizes[component] += 1
+        return sizes
+
+    def component_stats(self):
+        """
+        Returns summary statistics of component sizes: the number of
+        components, the largest size and its share of all people, the
+        number of isolated people, and a histogram mapping each size to
+        how many components have it.
+        """
+        sizes = self.component_sizes()
+        histogram = {}
+        for size in sizes:
+            histogram[size] = histogram.get(size, 0) + 1
+        largest = max(sizes, default=0)
+        return {
+            "components": len(sizes),
+            "largest": largest,
+            "largest_share": largest / self.num_people if sizes else 0.0,
+            "singletons": histogram.get(1, 0),
+            "histogram": dict(sorted(histogram.items())),
+        }
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """
+        Returns the movie numbers a person starred in.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the person numbers that starred in a movie.
+        """
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) number pairs for people who starred
+        with a given person, including the person themselves.
+        """
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                yield movie, star
+
+    def expander(self):
+        """
+        Returns a neighbors function for a single breadth-first search
+        that expands each movie at most once: it yields (movie, person)
+        pairs for the co-stars of a person, skipping the person
+        themselves and any movie it has already expanded.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        expanded = bytearray(self.num_movies)
+
+        def expand(person):
+            start, end = person_offsets[person], person_offsets[person + 1]
+            for movie in person_movies[start:end]:
+                if expanded[movie]:
+                    continue
+                expanded[movie] = 1
+                start, end = movie_offsets[movie], movie_offsets[movie + 1]
+                for star in movie_stars[start:end]:
+                    if star != person:
+                        yield movie, star
+
+        return expand
+
+    def distances(self, source):
+        """
+        Returns an int16 array of breadth-first distances from `source`
+        to every person, with UNREACHABLE for other components.
+        """
+        distances = array("h", [UNREACHABLE]) * self.num_people
+        distances[source] = 0
+        expand = self.expander()
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for person in layer:
+                for _, star in expand(person):
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_layer.append(star)
+            layer = next_layer
+        return distances
+
+    def tree(self, source):
+        """
+        Runs a breadth-first search from `source` over the whole
+        component and returns (parents, movies) arrays: for every
+        reached person other than the source, the person they were
+        reached from and the movie linking them. Unreached people and
+        the source hold -1.
+        """
+        parents = array("i", [-1]) * self.num_people
+        movies = array("i", [-1]) * self.num_people
+        reached = bytearray(self.num_people)
+        reached[source] = 1
+        expand = self.expander()
+        layer = [source]
+        while layer:
+            next_layer = []
+            for person in layer:
+                for movie, star in expand(person):
+                    if not reached[star]:
+                        reached[star] = 1
+                        parents[star] = person
+                        movies[star] = movie
+                        next_layer.append(star)
+            layer = next_layer
+        return parents, movies
+
+    def person(self, person_id):
+        """
+        Returns the record for an IMDB person id in the same shape
+        as the dict layout: name, birth, movies (a set of movie_ids).
+        """
+        person = self.person_index[person_id]
+        return {
+            "name": self.person_names[person],
+            "birth": self.person_births[person],
+            "movies": {self.movie_ids[m] for m in self.movies_of(person)}
+        }
+
+    def movie(self, movie_id):
+        """
+        Returns the record for an IMDB movie id in the same shape
+        as the dict layout: title, year, stars (a set of person_ids).
+        """
+        movie = self.movie_index[movie_id]
+        return {
+            "title": self.movie_titles[movie],
+            "year": self.movie_years[movie],
+            "stars": {self.person_ids[p] for p in self.stars_of(movie)}
+        }
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDB ids of everyone with a given name,
+        most popular first.
+        """
+        return [self.person_ids[p] for p in self.name_index.exact(name)]
+
+
+def csr(size, sources, targets):
+    """
+    Counting-sort parallel edge arrays into CSR (offsets, neighbors),
+    where the neighbors of `i` are `neighbors[offsets[i]:offsets[i + 1]]`.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    neighbors = array("i", [0]) * len(targets)
+    cursor = array("i", offsets)
+    for source, target in zip(sources, targets):
+        neighbors[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, neighbors
+
+
+def unique_edges(size, sources, targets):
+    """
+    Returns the parallel edge arrays without repeated (source, target)
+    pairs, keeping the first of each in order. Sources are numbered
+    below `size`.
+    """
+    offsets, edges = csr(size, sources, range(len(sources)))
+    keep = bytearray(b"\1") * len(sources)
+    repeated = False
+    for source in range(size):
+        start, end = offsets[source], offsets[source + 1]
+        if end - start < 2:
+            continue
+        seen = set()
+        for edge in edges[start:end]:
+            target = targets[edge]
+            if target in seen:
+                keep[edge] = 0
+                repeated = True
+            else:
+                seen.add(target)
+    if not repeated:
+        return sources, targets
+    return (
+        array("i", (s for s, k in zip(sources, keep) if k)),
+        array("i", (t for t, k in zip(targets, keep) if k)),
+    )
+
+
+def read_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Yields lists of up to `chunk_rows` tuples holding the named
+    `columns` (at least two) of each row in the CSV file at `path`,
+    skipping blank lines as csv.DictReader does.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = filter(None, csv.reader(f))
+        header = next(reader)
+        pick = itemgetter(*(header.index(column) for column in columns))
+        while True:
+            chunk = [pick(row) for row in islice(reader, chunk_rows)]
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,50 @@
+class Recorder():
+    """
+    Search hook that keeps the stats dict of every search it is called
+    with and summarises them.
+
+        recorder = Recorder()
+        degrees.search_hook = recorder
+        ...
+        recorder.summary()
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, stats):
+        self.records.append(dict(stats))
+
+    def clear(self):
+        self.records.clear()
+
+    def summary(self):
+        """
+        Returns the number of searches and, for every numeric counter,
+        its mean, median, 99th percentile and maximum.
+        """
+        result = {"searches": len(self.records)}
+        keys = sorted({
+            key for stats in self.records for key, value in stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        })
+        for key in keys:
+            values = sorted(
+                stats[key] for stats in self.records if key in stats
+            )
+            result[key] = {
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+            }
+        return result
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which `fraction` of sorted `values` fall.
+    """
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
@@ -0,0 +1,137 @@
+import json
+import os
+import struct
+from array import array
+
+from graph import UNREACHABLE
+from snapshot import fingerprint, read_header, replace_file
+
+# Bump whenever the file layout changes
+MAGIC = b"DEGLMRK\0"
+VERSION = 1
+
+LANDMARKS_NAME = "landmarks.snapshot"
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few landmark people to everyone.
+
+    By the triangle inequality, |d(L, t) - d(L, v)| never overestimates
+    the distance from `v` to `t`, so the largest such gap over all
+    landmarks is an admissible A* heuristic. A landmark that reaches
+    exactly one of two people also proves they are not connected.
+    """
+
+    def __init__(self, landmarks, distances, size):
+        self.landmarks = list(landmarks)
+        self.size = size
+
+        # Row `i` holds the distances from landmark `i`
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count):
+        """
+        Pick the `count` people with the most co-star links as
+        landmarks and run a breadth-first search from each.
+        """
+        size = graph.num_people
+        landmarks = sorted(range(size), key=lambda p: -costar_degree(graph, p))
+        landmarks = landmarks[:count]
+
+        distances = array("h")
+        for landmark in landmarks:
+            distances.extend(graph.distances(landmark))
+        return cls(landmarks, distances, size)
+
+    def heuristic(self, target):
+        """
+        Returns a function estimating the distance from a person to
+        `target`; it returns None for people that cannot reach it.
+        """
+        size = self.size
+        distances = self.distances
+        rows = [
+            (i * size, distances[i * size + target])
+            for i in range(len(self.landmarks))
+        ]
+
+        def estimate(person):
+            best = 0
+            for offset, to_target in rows:
+                to_person = distances[offset + person]
+                if to_target == UNREACHABLE:
+                    if to_person != UNREACHABLE:
+                        return None
+                    continue
+                if to_person == UNREACHABLE:
+                    return None
+                gap = abs(to_target - to_person)
+                if gap > best:
+                    best = gap
+            return best
+
+        return estimate
+
+
+def costar_degree(graph, person):
+    """
+    Returns the number of (movie, co-star) links of a person.
+    """
+    offsets = graph.movie_offsets
+    return sum(
+        offsets[movie + 1] - offsets[movie] - 1
+        for movie in graph.movies_of(person)
+    )
+
+
+def load_landmarks(graph, directory, count):
+    """
+    Returns the landmark index for `directory`, reading it from disk if
+    it was built from the same CSV files with the same landmark count,
+    and otherwise building and saving it.
+    """
+    path = os.path.join(directory, LANDMARKS_NAME)
+    sources = fingerprint(directory)
+    count = min(count, graph.num_people)
+    index = read_landmarks(path, sources, count, graph.num_people)
+    if index is None:
+        index = LandmarkIndex.build(graph, count)
+        write_landmarks(index, path, sources)
+    return index
+
+
+def write_landmarks(index, path, sources):
+    header = json.dumps({
+        "version": VERSION,
+        "sources": sources,
+        "landmarks": index.landmarks,
+        "size": index.size,
+    }).encode("utf-8")
+
+    with replace_file(path) as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(index.distances.tobytes())
+
+
+def read_landmarks(path, sources, count, size):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        header = read_header(f, MAGIC)
+        if (header is None or header.get("version") != VERSION
+                or header.get("sources") != sources
+                or len(header["landmarks"]) != count
+                or header["size"] != size):
+            return None
+        distances = array("h")
+        data = f.read()
+        if len(data) != count * size * distances.itemsize:
+            return None
+        distances.frombytes(data)
+    return LandmarkIndex(header["landmarks"], distances, size)
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import csv
+import json
+import random
+from time import perf_counter
+
+from instrument import percentile
+
+
+def read_people(directory, column="id"):
+    with open(f"degrees/{directory}/people.csv", encoding="utf-8") as f:
+        return [row[column] for row in csv.DictReader(f)]
+
+
+async def client(host, port, requests, latencies, errors):
+    """
+    Send `requests` one at a time over a single connection, recording
+    the latency of each answer.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            start = perf_counter()
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(perf_counter() - start)
+            if "error" in response:
+                errors[response["error"]] = errors.get(response["error"], 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, people, total, concurrency, seed, by_name=False):
+    """
+    Send `total` queries between random `people`, which are names if
+    `by_name` and ids otherwise.
+    """
+    rng = random.Random(seed)
+    source, target = ("source", "target") if by_name else (
+        "source_id", "target_id"
+    )
+    requests = [
+        {source: rng.choice(people), target: rng.choice(people)}
+        for _ in range(total)
+    ]
+
+    latencies = []
+    errors = {}
+    start = perf_counter()
+    await asyncio.gather(*(
+        client(host, port, requests[i::concurrency], latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "qps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load generator for the degrees query server"
+    )
+    parser.add_argument("--directory", default="small",
+                        help="dataset to draw random people from")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--by-name", action="store_true",
+                        help="query by name (ambiguous names are errors) "
+                             "instead of by id")
+    args = parser.parse_args()
+
+    people = read_people(args.directory, "name" if args.by_name else "id")
+    result = asyncio.run(run(
+        args.host, args.port, people, args.requests, args.concurrency,
+        args.seed, args.by_name
+    ))
+    print(f"Requests: {result['requests']} in {result['seconds']:.2f}s "
+          f"({result['qps']:.0f} QPS)")
+    print(f"Latency p50: {result['p50_ms']:.2f} ms, "
+          f"p99: {result['p99_ms']:.2f} ms")
+    for error, count in result["errors"].items():
+        print(f"  {error}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+from heapq import nsmallest
+
+# Sorts after every character, so `prefix + LAST` bounds all keys
+# that start with `prefix`
+LAST = chr(0x10FFFF)
+
+
+class NameIndex():
+    """
+    Sorted index of lowercase names for exact, prefix and fuzzy lookup.
+
+    `keys` is the sorted list of distinct lowercase names, and the people
+    sharing `keys[i]` are `people[offsets[i]:offsets[i + 1]]`. Results
+    are ranked by `popularity(person)`, highest first.
+    """
+
+    def __init__(self, keys, offsets, people, popularity):
+        self.keys = keys
+        self.offsets = offsets
+        self.people = people
+        self.popularity = popularity
+
+    @classmethod
+    def from_names(cls, names, popularity):
+        """
+        Build an index from a dict mapping lowercase names to
+        collections of people.
+        """
+        keys = sorted(names)
+        offsets = [0]
+        people = []
+        for key in keys:
+            people.extend(names[key])
+            offsets.append(len(people))
+        return cls(keys, offsets, people, popularity)
+
+    def people_for(self, i):
+        return self.people[self.offsets[i]:self.offsets[i + 1]]
+
+    def rank(self, people, limit=None):
+        """
+        Returns people ordered by popularity, keeping at most `limit`.
+        """
+        key = self.popularity
+        if limit is None:
+            return sorted(people, key=lambda person: -key(person))
+        return nsmallest(limit, people, key=lambda person: -key(person))
+
+    def exact(self, name):
+        """
+        Returns everyone named `name`, most popular first.
+        """
+        name = name.lower()
+        i = bisect_left(self.keys, name)
+        if i == len(self.keys) or self.keys[i] != name:
+            return []
+        return self.rank(self.people_for(i))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` people whose name starts with `prefix`,
+        most popular first.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + LAST, start)
+        matches = (
+            person
+            for i in range(start, end)
+            for person in self.people_for(i)
+        )
+        return self.rank(matches, limit)
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (person, distance) pairs for people whose
+        name is within `max_distance` edits of `name`, closest first and
+        then most popular first.
+
+        Walks the sorted keys as an implicit trie: the edit distance rows
+        of a shared prefix are reused, and every key below a prefix that
+        is already too far from `name` is skipped with one bisection.
+        """
+        name = name.lower()
+        keys = self.keys
+        rows = [list(range(len(name) + 1))]
+        previous = ""
+        matches = []
+
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+
+            # Keep the rows for the prefix shared with the previous key
+            common = 0
+            limit_common = min(len(previous), len(key), len(rows) - 1)
+            while common < limit_common and previous[common] == key[common]:
+                common += 1
+            del rows[common + 1:]
+            previous = key
+
+            pruned = False
+            for depth in range(common, len(key)):
+                row = next_row(rows[-1], key[depth], name)
+                rows.append(row)
+                if min(row) > max_distance:
+                    i = bisect_left(keys, key[:depth + 1] + LAST, i + 1)
+                    pruned = True
+                    break
+            if pruned:
+                continue
+
+            distance = rows[-1][-1]
+            if distance <= max_distance:
+                matches.extend(
+                    (distance, person) for person in self.people_for(i)
+                )
+            i += 1
+
+        popularity = self.popularity
+        matches.sort(key=lambda match: (match[0], -popularity(match[1])))
+        return [(person, distance) for distance, person in matches[:limit]]
+
+
+def next_row(row, character, name):
+    """
+    Returns the Levenshtein row for one more key character, given the
+    row for the key so far against every prefix of `name`.
+    """
+    result = [row[0] + 1]
+    for j, other in enumerate(name, 1):
+        result.append(min(
+            result[j - 1] + 1,
+            row[j] + 1,
+            row[j - 1] + (other != character)
+        ))
+    return result
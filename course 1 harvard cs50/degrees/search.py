@@ -0,0 +1,472 @@
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from time import perf_counter
+
+from util import Node, QueueFrontier
+
+
+def path_to(node):
+    """
+    Returns the (action, state) pairs leading from the root to `node`.
+    """
+    path = []
+    while node.parent is not None:
+        path.append((node.action, node.state))
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def record(stats, expanded, frontier_peak, explored, path_time):
+    """
+    Store the instrumentation counters of one search in `stats`:
+    states expanded, largest frontier, states reached and seconds spent
+    reconstructing the path.
+    """
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["frontier_peak"] = frontier_peak
+        stats["explored"] = explored
+        stats["path_time"] = path_time
+
+
+def breadth_first_search(source, target, neighbors, stats=None,
+                         explored=None):
+    """
+    Returns the shortest list of (action, state) pairs that lead from
+    `source` to `target`, expanding one side only, or None if there is
+    no path.
+
+    `neighbors(state)` yields (action, state) pairs. If `stats` is
+    given, the counters listed in `record` are stored in it. `explored`
+    may be any empty container with `add` and `in`, such as an
+    `IndexSet` for integer states; it defaults to a set.
+    """
+    expanded = 0
+    peak = 1
+    path_time = 0.0
+    if explored is None:
+        explored = set()
+    try:
+        if source == target:
+            return []
+
+        frontier = QueueFrontier()
+        frontier.add(Node(state=source, parent=None, action=None))
+        explored.add(source)
+
+        while not frontier.empty():
+            node = frontier.remove()
+            expanded += 1
+            for action, state in neighbors(node.state):
+                if state in explored:
+                    continue
+                child = Node(state=state, parent=node, action=action)
+                if state == target:
+                    start = perf_counter()
+                    path = path_to(child)
+                    path_time = perf_counter() - start
+                    return path
+                explored.add(state)
+                frontier.add(child)
+            if len(frontier) > peak:
+                peak = len(frontier)
+        return None
+    finally:
+        record(stats, expanded, peak, len(explored), path_time)
+
+
+def breadth_first_tree(source, neighbors, targets=None, explored=None):
+    """
+    Returns a dict mapping every state reached by a breadth-first search
+    from `source` to its (action, parent) pair; the source maps to
+    (None, None).
+
+    If `targets` is given, the search stops as soon as all of them have
+    been reached.
+    """
+    parents = {source: (None, None)}
+    remaining = set(targets) if targets is not None else None
+    if remaining is not None:
+        remaining.discard(source)
+        if not remaining:
+            return parents
+
+    if explored is None:
+        explored = set()
+    explored.add(source)
+    frontier = deque([source])
+    while frontier:
+        state = frontier.popleft()
+        for action, neighbor in neighbors(state):
+            if neighbor in explored:
+                continue
+            explored.add(neighbor)
+            parents[neighbor] = (action, state)
+            frontier.append(neighbor)
+            if remaining is not None:
+                remaining.discard(neighbor)
+                if not remaining:
+                    return parents
+    return parents
+
+
+def path_in_tree(parents, target):
+    """
+    Returns the (action, state) pairs leading from the root of a tree
+    built by `breadth_first_tree` to `target`, or None if it was not
+    reached.
+    """
+    if target not in parents:
+        return None
+    path = []
+    action, parent = parents[target]
+    while parent is not None:
+        path.append((action, target))
+        target = parent
+        action, parent = parents[target]
+    path.reverse()
+    return path
+
+
+def bidirectional_search(source, target, neighbors, stats=None,
+                         backward_neighbors=None):
+    """
+    Returns the shortest list of (action, state) pairs that lead from
+    `source` to `target`, or None if there is no path.
+
+    Runs a breadth-first search from both ends of an undirected graph,
+    always expanding the smaller frontier by one full layer, and stops
+    on the layer where the two searches meet. If `backward_neighbors`
+    is given, it expands the search from the target.
+    """
+    if backward_neighbors is None:
+        backward_neighbors = neighbors
+    expanded = 0
+    peak = 2
+    path_time = 0.0
+
+    # Maps each state reached from either end to (action, parent, depth)
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    try:
+        if source == target:
+            return []
+
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, other = forward_frontier, forward, backward
+                expand = neighbors
+            else:
+                frontier, parents, other = backward_frontier, backward, forward
+                expand = backward_neighbors
+
+            # Expand the whole layer, keeping the best meeting point
+            best = None
+            layer = []
+            for state in frontier:
+                expanded += 1
+                depth = parents[state][2] + 1
+                for action, neighbor in expand(state):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (action, state, depth)
+                    layer.append(neighbor)
+                    if neighbor in other:
+                        length = depth + other[neighbor][2]
+                        if best is None or length < best[0]:
+                            best = (length, neighbor)
+
+            peak = max(peak, len(layer) + len(frontier),
+                       len(forward_frontier) + len(backward_frontier))
+            if best is not None:
+                start = perf_counter()
+                path = join_paths(forward, backward, best[1])
+                path_time = perf_counter() - start
+                return path
+
+            if parents is forward:
+                forward_frontier = layer
+            else:
+                backward_frontier = layer
+        return None
+    finally:
+        record(stats, expanded, peak, len(forward) + len(backward), path_time)
+
+
+def join_paths(forward, backward, meet):
+    """
+    Joins the forward and backward parent maps at state `meet` into a
+    single list of (action, state) pairs.
+    """
+    path = []
+    state = meet
+    while forward[state][1] is not None:
+        action, parent, _ = forward[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+
+    # Backward parents point towards the target, so walking them from
+    # the meeting point moves forward along the path
+    state = meet
+    while backward[state][1] is not None:
+        action, parent, _ = backward[state]
+        path.append((action, parent))
+        state = parent
+    return path
+
+
+def astar_search(source, target, neighbors, heuristic, stats=None):
+    """
+    Returns the shortest list of (action, state) pairs that lead from
+    `source` to `target` over unit-cost steps, or None if there is no
+    path.
+
+    `heuristic(state)` must never overestimate the distance to the
+    target and may return None for states that cannot reach it, which
+    are then never queued.
+    """
+    expanded = 0
+    peak = 1
+    path_time = 0.0
+
+    # Maps each reached state to (action, parent, cost so far); ties
+    # on f are broken towards deeper states, then insertion order
+    parents = {source: (None, None, 0)}
+    try:
+        if source == target:
+            return []
+        estimate = heuristic(source)
+        if estimate is None:
+            return None
+
+        order = count()
+        frontier = [(estimate, 0, next(order), source)]
+        closed = set()
+
+        while frontier:
+            _, _, _, state = heappop(frontier)
+            if state in closed:
+                continue
+            if state == target:
+                start = perf_counter()
+                path = []
+                action, parent, _ = parents[state]
+                while parent is not None:
+                    path.append((action, state))
+                    state = parent
+                    action, parent, _ = parents[state]
+                path.reverse()
+                path_time = perf_counter() - start
+                return path
+
+            closed.add(state)
+            expanded += 1
+            cost = parents[state][2] + 1
+            for action, neighbor in neighbors(state):
+                if neighbor in closed:
+                    continue
+                known = parents.get(neighbor)
+                if known is not None and known[2] <= cost:
+                    continue
+                estimate = heuristic(neighbor)
+                if estimate is None:
+                    continue
+                parents[neighbor] = (action, state, cost)
+                heappush(
+                    frontier, (cost + estimate, -cost, next(order), neighbor)
+                )
+            if len(frontier) > peak:
+                peak = len(frontier)
+        return None
+    finally:
+        record(stats, expanded, peak, len(parents), path_time)
+
+
+class ShortestPaths():
+    """
+    Every shortest path between two states, found by layered breadth-first
+    searches from both ends.
+
+    `forward` and `backward` map each reached state to its distance from
+    the source and from the target, and `forward_counts` and
+    `backward_counts` to the number of shortest paths reaching it. Every
+    shortest path crosses exactly one of the `meets`, so the total count
+    is a sum of products and paths can be listed lazily by walking the
+    distance layers outwards from each meeting state.
+    """
+
+    def __init__(self, neighbors, forward, forward_counts, backward,
+                 backward_counts, meets):
+        self.neighbors = neighbors
+        self.forward = forward
+        self.forward_counts = forward_counts
+        self.backward = backward
+        self.backward_counts = backward_counts
+        self.meets = meets
+
+    @property
+    def length(self):
+        meet = self.meets[0]
+        return self.forward[meet] + self.backward[meet]
+
+    @property
+    def count(self):
+        return sum(
+            self.forward_counts[meet] * self.backward_counts[meet]
+            for meet in self.meets
+        )
+
+    def __iter__(self):
+        """
+        Yields each shortest path as a list of (action, state) pairs.
+        """
+        for meet in self.meets:
+            for head in self.heads(meet):
+                for tail in self.tails(meet):
+                    yield head + tail
+
+    def heads(self, state):
+        """
+        Yields every shortest path from the source to `state`.
+        """
+        depth = self.forward[state]
+        if depth == 0:
+            yield []
+            return
+        for action, parent in self.neighbors(state):
+            if self.forward.get(parent) == depth - 1:
+                for path in self.heads(parent):
+                    path.append((action, state))
+                    yield path
+
+    def tails(self, state):
+        """
+        Yields every shortest path from `state` to the target.
+        """
+        depth = self.backward[state]
+        if depth == 0:
+            yield []
+            return
+        for action, child in self.neighbors(state):
+            if self.backward.get(child) == depth - 1:
+                for path in self.tails(child):
+                    yield [(action, child)] + path
+
+
+def shortest_paths(source, target, neighbors):
+    """
+    Returns a ShortestPaths holding every shortest path from `source`
+    to `target` in an undirected graph, or None if there is no path.
+
+    Both ends are expanded a full layer at a time, smaller frontier
+    first, while counting the shortest paths into each new state. The
+    search stops on the first layer that reaches the other side.
+    """
+    forward, forward_counts = {source: 0}, {source: 1}
+    backward, backward_counts = {target: 0}, {target: 1}
+    if source == target:
+        return ShortestPaths(
+            neighbors, forward, forward_counts, backward, backward_counts,
+            [source]
+        )
+
+    forward_frontier = [source]
+    backward_frontier = [target]
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, depths, counts, other = (
+                forward_frontier, forward, forward_counts, backward
+            )
+        else:
+            frontier, depths, counts, other = (
+                backward_frontier, backward, backward_counts, forward
+            )
+
+        layer = []
+        for state in frontier:
+            depth = depths[state] + 1
+            paths = counts[state]
+            for _, neighbor in neighbors(state):
+                known = depths.get(neighbor)
+                if known is None:
+                    depths[neighbor] = depth
+                    counts[neighbor] = paths
+                    layer.append(neighbor)
+                elif known == depth:
+                    counts[neighbor] += paths
+
+        meets = [state for state in layer if state in other]
+        if meets:
+            best = min(depths[state] + other[state] for state in meets)
+            meets = [
+                state for state in meets
+                if depths[state] + other[state] == best
+            ]
+            return ShortestPaths(
+                neighbors, forward, forward_counts, backward,
+                backward_counts, meets
+            )
+
+        if depths is forward:
+            forward_frontier = layer
+        else:
+            backward_frontier = layer
+    return None
+
+
+def k_shortest_paths(source, target, neighbors, k):
+    """
+    Yields up to `k` simple paths from `source` to `target` as lists of
+    (action, state) pairs, shortest first (Yen's algorithm, with a
+    breadth-first search for each spur path).
+    """
+    first = breadth_first_search(source, target, neighbors)
+    if first is None or k <= 0:
+        return
+    found = [first]
+    yield first
+
+    seen = {tuple(first)}
+    candidates = []
+    order = count()
+    while len(found) < k:
+        last = found[-1]
+        states = [source] + [state for _, state in last]
+        for i in range(len(last)):
+            spur = states[i]
+            root = last[:i]
+
+            # Leave the root path only by edges no earlier path has taken
+            banned_steps = {
+                path[i] for path in found
+                if len(path) > i and path[:i] == root
+            }
+            banned_states = set(states[:i])
+
+            def spur_neighbors(state):
+                for action, neighbor in neighbors(state):
+                    if neighbor in banned_states:
+                        continue
+                    if state == spur and (action, neighbor) in banned_steps:
+                        continue
+                    yield action, neighbor
+
+            spur_path = breadth_first_search(spur, target, spur_neighbors)
+            if spur_path is None:
+                continue
+            path = root + spur_path
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heappush(candidates, (len(path), next(order), path))
+
+        if not candidates:
+            return
+        _, _, path = heappop(candidates)
+        found.append(path)
+        yield path
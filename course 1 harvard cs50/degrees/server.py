@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+from batch import init_worker, resolve
+
+
+def find_path(source, target):
+    """
+    Run one search in a worker process.
+    """
+    return degrees.shortest_path(source, target)
+
+
+class DegreesServer():
+    """
+    Line-protocol server answering degrees queries from a graph loaded
+    once. Each request is one JSON object per line:
+
+        {"source": "Kevin Bacon", "target": "Tom Hanks"}
+        {"source_id": "102", "target_id": "158"}
+        {"complete": "tom h"}
+        {"match": "tom hnaks"}
+        {"stats": true}
+
+    and each response is one JSON object per line. Either end of a path
+    may be given by name or, for names shared by several people, by id.
+    Searches run in a process pool; at most `max_queue` may be waiting
+    or running at once. A search's answer is abandoned after `timeout`
+    seconds, but it still counts towards `max_queue` until its worker
+    finishes it. Answers are kept in an LRU cache of `cache_size` pairs
+    in the serving process.
+    """
+
+    def __init__(self, directory, workers=None, max_queue=1024, timeout=5.0,
+                 cache_size=4096):
+        self.directory = directory
+        self.workers = workers or os.cpu_count()
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.pending = 0
+        self.executor = None
+
+    def start(self):
+        """
+        Load the graph here (for name lookups) and in every worker.
+        """
+        degrees.load_data(self.directory, snapshot=True)
+
+        # Trees would be built on the event loop, so only cache answers
+        degrees.enable_cache(max_paths=self.cache_size, max_trees=0)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_worker,
+            initargs=(self.directory,)
+        )
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def handle(self, reader, writer):
+        """
+        Answer requests from one connection in order until it closes.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    response = {"error": "invalid json"}
+                else:
+                    response = await self.safe_respond(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def safe_respond(self, request):
+        """
+        Returns the response to a request, turning any failure into an
+        error response so the connection stays open. The traceback is
+        printed on the server.
+        """
+        try:
+            return await self.respond(request)
+        except Exception as e:
+            traceback.print_exc()
+            return {"error": f"internal error: {type(e).__name__}"}
+
+    async def respond(self, request):
+        if not isinstance(request, dict):
+            return {"error": "request must be an object"}
+        for key in ("complete", "match", "source", "target"):
+            if key in request and not isinstance(request[key], str):
+                return {"error": f"{key} must be a string"}
+        for key in ("source_id", "target_id"):
+            value = request.get(key, "")
+            if isinstance(value, bool) or not isinstance(value, (str, int)):
+                return {"error": f"{key} must be a string or integer"}
+        if "complete" in request:
+            return {"people": self.describe(
+                degrees.complete_name(request["complete"])
+            )}
+        if "match" in request:
+            matches = degrees.match_name(request["match"])
+            return {"people": self.describe(
+                [person_id for person_id, _ in matches]
+            )}
+        if (("source" in request or "source_id" in request)
+                and ("target" in request or "target_id" in request)):
+            return await self.path(request)
+        if "stats" in request:
+            cache = degrees.cache.stats() if degrees.cache is not None else None
+            return {"pending": self.pending, "cache": cache}
+        return {"error": "unknown request"}
+
+    async def path(self, request):
+        source, status = self.endpoint(request, "source")
+        if source is None:
+            return {"error": f"source {status}"}
+        target, status = self.endpoint(request, "target")
+        if target is None:
+            return {"error": f"target {status}"}
+
+        if degrees.cache is not None:
+            found, path = degrees.cache.get(source, target)
+            if found:
+                return self.answer(source, target, path)
+
+        # Shed load instead of letting the queue grow without bound
+        if self.pending >= self.max_queue:
+            return {"error": "busy"}
+
+        # A search stays pending until its worker is done with it, even
+        # if its answer is abandoned, so max_queue bounds the pool's work
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            future = self.executor.submit(find_path, source, target)
+        except Exception:
+            self.pending -= 1
+            raise
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self.finished)
+        )
+        try:
+            path = await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return {"error": "timeout"}
+
+        if degrees.cache is not None:
+            degrees.cache.put(source, target, path)
+        return self.answer(source, target, path)
+
+    def finished(self):
+        self.pending -= 1
+
+    def endpoint(self, request, role):
+        """
+        Returns (person_id, None) for the source or target of a request,
+        given by id under "<role>_id" or by name under "<role>", or
+        (None, status) if it cannot be resolved.
+        """
+        key = f"{role}_id"
+        if key not in request:
+            return resolve(request[role])
+        person_id = str(request[key])
+        try:
+            degrees.person(person_id)
+        except KeyError:
+            return None, "not found"
+        return person_id, None
+
+    def answer(self, source, target, path):
+        if path is None:
+            return {"source": source, "target": target, "degrees": None,
+                    "path": None}
+        return {"source": source, "target": target, "degrees": len(path),
+                "path": path}
+
+    def describe(self, person_ids):
+        people = []
+        for person_id in person_ids:
+            record = degrees.person(person_id)
+            people.append({
+                "id": person_id,
+                "name": record["name"],
+                "birth": record["birth"],
+            })
+        return people
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees query server")
+    parser.add_argument("--directory", default="small")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="search processes (default: one per CPU)")
+    parser.add_argument("--max-queue", type=int, default=1024,
+                        help="searches allowed in flight before rejecting")
+    parser.add_argument("--timeout", type=float, default=5.0,
+                        help="seconds before a search is abandoned")
+    parser.add_argument("--cache", type=int, default=4096,
+                        help="answers kept in the LRU cache (0 disables)")
+    args = parser.parse_args()
+
+    server = DegreesServer(
+        args.directory, args.workers, args.max_queue, args.timeout,
+        args.cache
+    )
+    print("Loading data...")
+    server.start()
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from graph import Graph
+from nameindex import NameIndex
+
+# Bump whenever the file layout or the set of stored columns changes
+MAGIC = b"DEGREES\0"
+VERSION = 5
+
+SNAPSHOT_NAME = "graph.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Graph attributes stored as raw int32 arrays
+INT_COLUMNS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars",
+    "components",
+)
+
+# Graph attributes stored as concatenated UTF-8 strings, each with an
+# int32 "<name>.offsets" section locating the strings
+STR_COLUMNS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+)
+
+
+class StringColumn():
+    """
+    Read-only sequence of strings decoded on access from a buffer of
+    concatenated UTF-8, where string `i` is
+    `data[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        size = len(self)
+        if not -size <= i < size:
+            raise IndexError("string column index out of range")
+        i %= size
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class IdIndex():
+    """
+    Read-only mapping from IMDB ids to numbers, found by bisecting
+    `order`, the numbers sorted by id.
+    """
+
+    def __init__(self, ids, order):
+        self.ids = ids
+        self.order = order
+
+    def __getitem__(self, key):
+        i = bisect_right(self.order, key, key=self.ids.__getitem__)
+        if i == 0 or self.ids[self.order[i - 1]] != key:
+            raise KeyError(key)
+        return self.order[i - 1]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self.order)
+
+
+def fingerprint(directory):
+    """
+    Returns the size and modification time of each source CSV file,
+    used to tell whether a snapshot is stale.
+    """
+    result = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        result[name] = [stat.st_size, stat.st_mtime_ns]
+    return result
+
+
+def load_graph(directory, chunk_rows=None):
+    """
+    Returns the graph for `directory`, memory-mapping its snapshot if
+    it is up to date and otherwise parsing the CSV files and writing a
+    fresh snapshot for next time.
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    sources = fingerprint(directory)
+    graph = read_snapshot(path, sources)
+    if graph is None:
+        graph = Graph.from_csv(directory, chunk_rows=chunk_rows)
+        write_snapshot(graph, path, sources)
+    return graph
+
+
+def write_snapshot(graph, path, sources):
+    """
+    Write `graph` to `path` along with the fingerprint of the CSV
+    files it was built from.
+    """
+    columns = {}
+    for name in INT_COLUMNS:
+        columns[name] = ("i", getattr(graph, name).tobytes())
+    for name in STR_COLUMNS:
+        add_strings(columns, name, getattr(graph, name))
+
+    # Numbers sorted by id, so warm starts look ids up without
+    # rebuilding a dict
+    for name, ids in (("person_order", graph.person_ids),
+                      ("movie_order", graph.movie_ids)):
+        order = array("i", sorted(range(len(ids)), key=ids.__getitem__))
+        columns[name] = ("i", order.tobytes())
+
+    # Name index: sorted lowercase names and, in CSR form, their people
+    index = graph.name_index
+    add_strings(columns, "name_keys", index.keys)
+    columns["name_offsets"] = ("i", array("i", index.offsets).tobytes())
+    columns["name_people"] = ("i", array("i", index.people).tobytes())
+
+    # Lay sections out back to back, each aligned to 8 bytes
+    sections = {}
+    position = 0
+    for name, (kind, data) in columns.items():
+        sections[name] = [kind, position, len(data)]
+        position += len(data) + (-len(data) % 8)
+
+    header = json.dumps({
+        "version": VERSION,
+        "sources": sources,
+        "sections": sections,
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+
+    with replace_file(path) as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for kind, data in columns.values():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+
+
+def read_snapshot(path, sources):
+    """
+    Returns the graph stored at `path`, or None if there is no snapshot,
+    it was cut short, or it was written by another version or from
+    different CSV files.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        header = read_header(f, MAGIC)
+        if (header is None or header.get("version") != VERSION
+                or header.get("sources") != sources):
+            return None
+        start = f.tell()
+        end = max(
+            (offset + size for kind, offset, size
+             in header["sections"].values()),
+            default=0
+        )
+        if os.fstat(f.fileno()).st_size < start + end:
+            return None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Every column is a zero-copy view onto the mapped file, and strings
+    # are only decoded when looked up
+    view = memoryview(buffer)
+    sections = {
+        name: view[start + offset:start + offset + size]
+        for name, (kind, offset, size) in header["sections"].items()
+    }
+    columns = {}
+    for name, (kind, offset, size) in header["sections"].items():
+        if kind == "str":
+            offsets = sections[f"{name}.offsets"].cast("i")
+            columns[name] = StringColumn(sections[name], offsets)
+        else:
+            columns[name] = sections[name].cast("i")
+
+    graph = Graph()
+    graph.buffer = buffer
+    for name in INT_COLUMNS + STR_COLUMNS:
+        setattr(graph, name, columns[name])
+    graph.person_index = IdIndex(graph.person_ids, columns["person_order"])
+    graph.movie_index = IdIndex(graph.movie_ids, columns["movie_order"])
+
+    graph.name_index = NameIndex(
+        columns["name_keys"], columns["name_offsets"], columns["name_people"],
+        graph.popularity
+    )
+    return graph
+
+
+def read_header(f, magic):
+    """
+    Returns the JSON header that follows `magic` and the header length
+    at the start of a file, or None if the file does not start with
+    `magic` or the header was cut short.
+    """
+    if f.read(len(magic)) != magic:
+        return None
+    try:
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+    except (struct.error, ValueError):
+        return None
+    return header if isinstance(header, dict) else None
+
+
+@contextmanager
+def replace_file(path):
+    """
+    Yield a uniquely named temporary file beside `path` to write, then
+    move it over `path`, so readers never see a partial file and
+    processes writing at the same time never share a temporary file.
+    """
+    directory, name = os.path.split(path)
+    fd, temporary = tempfile.mkstemp(
+        dir=directory or ".", prefix=f"{name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def add_strings(columns, name, strings):
+    """
+    Add a string column and its "<name>.offsets" section to `columns`.
+    """
+    offsets = array("i", [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    columns[name] = ("str", bytes(data))
+    columns[f"{name}.offsets"] = ("i", offsets.tobytes())
@@ -1,4 +1,9 @@
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -7,17 +12,21 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Maps each queued state to the number of nodes holding it,
+        # so contains_state does not have to scan the frontier
+        self.states = {}
+
+    def __len__(self):
+        return len(self.frontier)
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        if state in self.frontier:
-            
-            return True
-        else:
-            return False
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -26,10 +35,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node.state)
             return node
 
+    def forget(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -37,13 +53,28 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = Node(self.frontier[0].state, self.frontier[0].parent, self.frontier[0].action)
-            if len(self.frontier) > 1:
-                self.frontier = self.frontier[1:]
-            else:
-                self.frontier = []
+            node = self.frontier.popleft()
+            self.forget(node.state)
             return node
-        
-        
 
 
+class IndexSet():
+    """
+    Set of integers in range(size), stored as one flag byte per
+    possible member instead of a hashed set.
+    """
+
+    def __init__(self, size):
+        self.flags = bytearray(size)
+        self.count = 0
+
+    def __contains__(self, item):
+        return self.flags[item] == 1
+
+    def __len__(self):
+        return self.count
+
+    def add(self, item):
+        if not self.flags[item]:
+            self.flags[item] = 1
+            self.count += 1
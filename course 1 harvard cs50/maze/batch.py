@@ -0,0 +1,146 @@
+import argparse
+import csv
+import fnmatch
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from maze import HEURISTICS, Maze, NoSolution
+
+FIELDS = ("file", "width", "height", "solvable", "length", "cost",
+          "explored", "time", "error")
+
+# Text files that directories and glob patterns can match but that are
+# not mazes
+NOT_MAZES = ("requirements*.txt",)
+
+
+def maze_files(paths):
+    """
+    Returns the sorted maze files named by `paths`, each of which may
+    be a file, a directory (all .txt files in it) or a glob pattern.
+    Directories and patterns skip files matching NOT_MAZES.
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, "*.txt"))
+        elif glob.has_magic(path):
+            matches = glob.glob(path, recursive=True)
+        else:
+            files.add(path)
+            continue
+        files.update(
+            match for match in matches
+            if not any(fnmatch.fnmatch(os.path.basename(match), pattern)
+                       for pattern in NOT_MAZES)
+        )
+    return sorted(files)
+
+
+def solve_file(job):
+    """
+    Solve one maze file. Returns a result dict with the keys in FIELDS,
+    where `time` is the seconds spent solving (not parsing).
+
+    With `multiple`, a maze may have several starts and goals. Several
+    starts are solved together by solve_all, which only runs the
+    "wavefront" or "dijkstra" algorithm; the result describes the
+    cheapest of their paths.
+    """
+    filename, algorithm, heuristic, multiple = job
+    result = dict.fromkeys(FIELDS)
+    result["file"] = filename
+    try:
+        maze = Maze(filename, multiple=multiple)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result["width"] = maze.width
+    result["height"] = maze.height
+
+    start = perf_counter()
+    try:
+        if len(maze.starts) > 1:
+            if algorithm not in ("wavefront", "dijkstra"):
+                raise ValueError("several starts need the wavefront or "
+                                 "dijkstra algorithm")
+            maze.solve_all(algorithm)
+        elif algorithm == "wavefront":
+            maze.solve_wavefront()
+        else:
+            maze.solve(heuristic, algorithm)
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+    except NoSolution:
+        result["solvable"] = False
+    else:
+        result["solvable"] = True
+        result["length"] = len(maze.solution[0])
+        result["cost"] = maze.solution_cost()
+    result["time"] = perf_counter() - start
+    result["explored"] = maze.num_explored
+    return result
+
+
+def run_batch(files, algorithm="greedy", heuristic="manhattan",
+              workers=None, multiple=False):
+    """
+    Solve many maze files across `workers` processes. Returns one
+    result dict per file, in order.
+    """
+    jobs = [(filename, algorithm, heuristic, multiple) for filename in files]
+    if workers == 1:
+        return list(map(solve_file, jobs))
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        return list(executor.map(solve_file, jobs, chunksize=chunksize))
+
+
+def write_results(results, f):
+    writer = csv.DictWriter(f, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve many mazes and summarise the results as CSV"
+    )
+    parser.add_argument("mazes", nargs="+",
+                        help="maze files, directories or glob patterns")
+    parser.add_argument("--output", help="CSV file (default: stdout)")
+    parser.add_argument("--algorithm", default="greedy",
+                        choices=("dfs", "bfs", "greedy", "astar", "dijkstra",
+                                 "jps", "wavefront"))
+    parser.add_argument("--heuristic", default="manhattan",
+                        choices=sorted(HEURISTICS))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--multiple", action="store_true",
+                        help="allow several starts and goals per maze")
+    args = parser.parse_args()
+
+    files = maze_files(args.mazes)
+    if not files:
+        sys.exit("No maze files found")
+    results = run_batch(files, args.algorithm, args.heuristic, args.workers,
+                        args.multiple)
+
+    if args.output is None:
+        write_results(results, sys.stdout)
+        return
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        write_results(results, f)
+    solved = sum(1 for result in results if result["solvable"])
+    print(f"Solved {solved} of {len(results)} mazes, "
+          f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
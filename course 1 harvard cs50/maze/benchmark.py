@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from generate import GENERATORS, generate
+from maze import Maze
+
+# Solver name -> function running it on a maze
+SOLVERS = {
+    "dfs": lambda maze: maze.solve(algorithm="dfs"),
+    "bfs": lambda maze: maze.solve(algorithm="bfs"),
+    "greedy": lambda maze: maze.solve(),
+    "astar": lambda maze: maze.solve(algorithm="astar"),
+    "jps": lambda maze: maze.solve(algorithm="jps"),
+    "wavefront": lambda maze: maze.solve_wavefront(),
+}
+
+
+def measure(filename, solvers=SOLVERS, repeat=1):
+    """
+    Solve one maze with every solver. Returns a dict per solver with
+    the solution length, states explored, best time in seconds and peak
+    bytes allocated while solving.
+    """
+    start = perf_counter()
+    maze = Maze(filename)
+    results = {"parse": perf_counter() - start}
+    for name, solve in solvers.items():
+        times = []
+        for _ in range(repeat):
+            start = perf_counter()
+            solve(maze)
+            times.append(perf_counter() - start)
+        results[name] = {
+            "length": len(maze.solution[0]),
+            "explored": maze.num_explored,
+            "time": min(times),
+            "peak": peak_memory(solve, maze),
+        }
+    return results
+
+
+def peak_memory(solve, maze):
+    """
+    Returns the most bytes allocated at once during one more run of
+    `solve`. tracemalloc slows every allocation down, so this run is
+    kept out of the timed ones.
+    """
+    tracemalloc.start()
+    try:
+        solve(maze)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def report(name, results):
+    print(f"{name} (parsed in {results['parse']:.3f}s)")
+    print(f"{'solver':<12}{'length':>10}{'explored':>12}{'ms':>12}"
+          f"{'peak MB':>12}")
+    for solver in SOLVERS:
+        result = results[solver]
+        print(f"{solver:<12}{result['length']:>10}{result['explored']:>12}"
+              f"{result['time'] * 1e3:>12.2f}{result['peak'] / 1e6:>12.2f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers")
+    parser.add_argument("mazes", nargs="*")
+    parser.add_argument("--generate", nargs="+", default=[],
+                        choices=sorted(GENERATORS), metavar="KIND",
+                        help="also benchmark generated mazes of these kinds")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[101],
+                        help="sizes of the generated mazes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs per solver, keeping the fastest")
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the results to FILE as JSON")
+    args = parser.parse_args()
+
+    mazes = args.mazes
+    if not mazes and not args.generate:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        mazes = [os.path.join(directory, f"maze{i}.txt") for i in (1, 2, 3)]
+
+    results = {}
+    for filename in mazes:
+        results[filename] = measure(filename, repeat=args.repeat)
+        report(filename, results[filename])
+
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in args.generate:
+            for size in args.sizes:
+                name = f"{kind}-{size}-{args.seed}"
+                filename = os.path.join(directory, f"{name}.txt")
+                with open(filename, "w") as f:
+                    f.write(generate(kind, size, seed=args.seed))
+                results[name] = measure(filename, repeat=args.repeat)
+                report(name, results[name])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
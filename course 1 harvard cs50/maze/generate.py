@@ -0,0 +1,163 @@
+import argparse
+import random
+
+import numpy as np
+
+
+def backtracker(height, width, seed=0):
+    """
+    Returns a height x width wall grid (True for walls) carved by a
+    randomized depth-first search: one long winding corridor with short
+    dead ends and exactly one path between any two cells.
+
+    Cells sit on odd rows and columns, with walls between them.
+    """
+    rng = random.Random(seed)
+    walls = bytearray(b"\1") * (height * width)
+    steps = cell_steps(width)
+
+    start = width + 1
+    walls[start] = 0
+    stack = [start]
+    while stack:
+        cell = stack[-1]
+        options = [
+            step for step in steps
+            if inside(cell + 2 * step, height, width, cell)
+            and walls[cell + 2 * step]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        step = rng.choice(options)
+        walls[cell + step] = 0
+        walls[cell + 2 * step] = 0
+        stack.append(cell + 2 * step)
+    return grid(walls, height, width)
+
+
+def prim(height, width, seed=0):
+    """
+    Returns a height x width wall grid carved by randomized Prim's
+    algorithm, which grows the maze outwards from one cell and gives
+    many short branching corridors instead of one long one.
+    """
+    rng = random.Random(seed)
+    walls = bytearray(b"\1") * (height * width)
+    steps = cell_steps(width)
+
+    start = width + 1
+    walls[start] = 0
+    edges = [(start, step) for step in steps]
+    while edges:
+
+        # Pop a random edge by swapping it to the end
+        i = rng.randrange(len(edges))
+        edges[i], edges[-1] = edges[-1], edges[i]
+        cell, step = edges.pop()
+
+        target = cell + 2 * step
+        if not inside(target, height, width, cell) or not walls[target]:
+            continue
+        walls[cell + step] = 0
+        walls[target] = 0
+        edges.extend((target, step) for step in steps)
+    return grid(walls, height, width)
+
+
+def open_rooms(height, width, seed=0, room=16):
+    """
+    Returns a height x width wall grid of open square rooms, `room`
+    cells across, joined by one doorway in each wall they share.
+    """
+    rng = random.Random(seed)
+    walls = np.zeros((height, width), dtype=bool)
+    walls[room::room + 1, :] = True
+    walls[:, room::room + 1] = True
+
+    # One doorway per wall segment between neighbouring rooms
+    for i in range(room, height, room + 1):
+        for start in range(0, width, room + 1):
+            end = min(start + room, width)
+            walls[i, rng.randrange(start, end)] = False
+    for j in range(room, width, room + 1):
+        for start in range(0, height, room + 1):
+            end = min(start + room, height)
+            walls[rng.randrange(start, end), j] = False
+    return walls
+
+
+# Generator name -> function of (height, width, seed)
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+    "rooms": open_rooms,
+}
+
+
+def cell_steps(width):
+    """
+    Returns the flat index steps to the wall beside a cell in each
+    direction; twice each step reaches the next cell.
+    """
+    return (-width, width, -1, 1)
+
+
+def inside(target, height, width, cell):
+    """
+    Returns whether the cell two steps from `cell` at flat index
+    `target` lies inside the outer wall, without wrapping rows.
+    """
+    row, col = divmod(target, width)
+    if not (0 < row < height - 1 and 0 < col < width - 1):
+        return False
+    return row == cell // width or col == cell % width
+
+
+def grid(walls, height, width):
+    return np.frombuffer(walls, dtype=bool).reshape(height, width)
+
+
+def maze_text(walls):
+    """
+    Returns the maze in the text format Maze reads, with the start in
+    the top left and the goal in the bottom right open cell.
+    """
+    height, width = walls.shape
+    chars = np.where(walls, ord("#"), ord(" ")).astype(np.uint8)
+    open_cells = np.flatnonzero(~walls)
+    if len(open_cells) < 2:
+        raise ValueError("maze needs at least two open cells")
+    chars.flat[open_cells[0]] = ord("A")
+    chars.flat[open_cells[-1]] = ord("B")
+
+    lines = np.full((height, width + 1), ord("\n"), dtype=np.uint8)
+    lines[:, :width] = chars
+    return lines.tobytes().decode("ascii")
+
+
+def generate(kind, height, width=None, seed=0):
+    """
+    Returns the text of a generated maze of the given kind and size.
+    """
+    walls = GENERATORS[kind](height, width or height, seed)
+    return maze_text(walls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a maze file")
+    parser.add_argument("output", help="maze text file to write")
+    parser.add_argument("--kind", default="backtracker",
+                        choices=sorted(GENERATORS))
+    parser.add_argument("--size", type=int, default=21,
+                        help="height in cells (and width, unless given)")
+    parser.add_argument("--width", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.output, "w") as f:
+        f.write(generate(args.kind, args.size, args.width, args.seed))
+
+
+if __name__ == "__main__":
+    main()
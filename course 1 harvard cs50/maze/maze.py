@@ -1,186 +1,489 @@
+import argparse
+import heapq
+import itertools
+import math
 import sys
+from collections import deque
+
+import numpy as np
+
+
+def manhattan(state, goal):
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+
+def euclidean(state, goal):
+    return math.hypot(state[0] - goal[0], state[1] - goal[1])
+
+
+def zero(state, goal):
+    return 0
+
+
+# Heuristics that can be passed to Maze.solve by name
+HEURISTICS = {
+    "manhattan": manhattan,
+    "euclidean": euclidean,
+    "zero": zero,
+}
+
+# Above this many goals, the Manhattan heuristic is read from a
+# precomputed distance transform instead of taking a minimum per call
+MANY_GOALS = 16
+
+# Wavefronts at least this many cells wide are grown with array
+# operations in Maze.distance_field, and narrower ones cell by cell
+DENSE_WAVEFRONT = 64
+
+# Kinds of cell shown by Maze.print and Maze.output_image, indexing
+# SYMBOLS and COLORS
+EMPTY, WALL, START, GOAL, SOLUTION, EXPLORED = range(6)
+SYMBOLS = (" ", "█", "A", "B", "*", " ")
+COLORS = (
+    (237, 240, 252),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+)
+
+# Empty cells are shaded from the EMPTY colour at cost 1 towards this
+# colour at MAX_COST
+TERRAIN_COLOR = (120, 90, 60)
+MAX_COST = 9
+
+# Action -> (row step, column step)
+DIRECTIONS = {
+    "up": (-1, 0),
+    "down": (1, 0),
+    "left": (0, -1),
+    "right": (0, 1),
+}
+
+
+class NoSolution(Exception):
+    """
+    Raised by the solvers when no goal can be reached from the start.
+    """
+
 
 class Node():
 
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
 
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
     
 class StackFrontier():
 
     def __init__(self):
 
-        self.frontier = []
+        self.frontier = deque()
+
+        # Queued states, for contains_state; solve checks it before
+        # adding a node, so no state is ever queued twice
+        self.states = set()
 
     def Add(self, node):
 
         self.frontier.append(node)
-    
-    def contains_state(self,state):
+        self.states.add(node.state)
 
-        if state in self.frontier:
+    def contains_state(self, state):
+
+        return state in self.states
 
-            return True
-        else:
-            return False
     def Empty(self):
 
-        if len(self.frontier) == 0:
-            return True
-        return False
-    
+        return len(self.frontier) == 0
+
     def Remove(self):
         if self.Empty() != True:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.states.discard(node.state)
             return node
         else:
             raise Exception("empty frontier")
-        
+
 
 class QueueFrontier(StackFrontier):
 
     def Remove(self):
         if self.Empty() != True:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
             return node
         else:
             raise Exception("empty frontier")
 
 
+class PriorityFrontier():
+    """
+    Frontier that removes the node with the lowest priority first,
+    breaking ties in the order nodes were added.
+    """
+
+    def __init__(self):
+
+        self.frontier = []
+        self.priorities = {}
+        self.counter = itertools.count()
+
+    def Add(self, node, priority):
+
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.priorities[node.state] = priority
+
+    def contains_state(self, state):
+
+        return state in self.priorities
+
+    def priority(self, state):
+
+        return self.priorities.get(state, math.inf)
+
+    def Empty(self):
+
+        return len(self.frontier) == 0
+
+    def Remove(self):
+        if self.Empty() != True:
+            priority, _, node = heapq.heappop(self.frontier)
+            if self.priorities.get(node.state) == priority:
+                del self.priorities[node.state]
+            return node
+        else:
+            raise Exception("empty frontier")
+
+
+class CellSet():
+    """
+    Set of maze cells kept as one bit per cell. Cells are given either
+    as (row, col) states or, through the *_cell methods, as flat indices
+    row * width + col.
+    """
+
+    def __init__(self, width, height):
+
+        self.width = width
+        self.height = height
+        self.bits = bytearray((width * height + 7) // 8)
+        self.count = 0
+
+    def add_cell(self, cell):
+
+        byte, bit = cell >> 3, 1 << (cell & 7)
+        if not self.bits[byte] & bit:
+            self.bits[byte] |= bit
+            self.count += 1
+
+    def has_cell(self, cell):
+
+        return self.bits[cell >> 3] & (1 << (cell & 7)) != 0
+
+    def add(self, state):
+
+        self.add_cell(state[0] * self.width + state[1])
+
+    def __contains__(self, state):
+
+        row, col = state
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return False
+        return self.has_cell(row * self.width + col)
+
+    def __len__(self):
+
+        return self.count
+
+    def __iter__(self):
+
+        for cell in np.flatnonzero(self.to_array()):
+            yield divmod(int(cell), self.width)
+
+    def to_array(self):
+        """
+        Returns the set as a height x width boolean array.
+        """
+        bits = np.unpackbits(
+            np.frombuffer(self.bits, dtype=np.uint8),
+            count=self.width * self.height, bitorder="little"
+        )
+        return bits.reshape(self.height, self.width).view(bool)
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        Returns the set of cells that are True in a boolean array.
+        """
+        cells = cls(array.shape[1], array.shape[0])
+        bits = np.packbits(array.reshape(-1), bitorder="little")
+        cells.bits[:] = bits.tobytes()
+        cells.count = int(np.count_nonzero(array))
+        return cells
+
 
 class Maze():
 
-    def __init__(self, filename):
+    def __init__(self, filename, multiple=False):
+        """
+        Load a maze from a text file. With `multiple`, the file may hold
+        several starts and goals: searches then stop at the nearest goal,
+        and solve_all finds a path from every start at once.
+        """
 
         # Read file and set height and width of maze
         with open(filename) as f:
             contents = f.read()
-    
 
         # Validate start and goal
-        if contents.count("A") != 1:
-            raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
-            raise Exception("maze must have exactly one goal")
+        if multiple:
+            if contents.count("A") < 1:
+                raise Exception("maze must have at least one start point")
+            if contents.count("B") < 1:
+                raise Exception("maze must have at least one goal")
+        else:
+            if contents.count("A") != 1:
+                raise Exception("maze must have exactly one start point")
+            if contents.count("B") != 1:
+                raise Exception("maze must have exactly one goal")
 
         # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        lines = contents.splitlines()
+        self.height = len(lines)
+        self.width = max(len(line) for line in lines)
+
+        # Lay the characters out in a grid, padding short lines with
+        # spaces (open cells), one byte per character for ASCII files
+        if contents.isascii():
+            dtype, encoding = np.uint8, "ascii"
+        else:
+            dtype, encoding = np.uint32, "utf-32-le"
+        grid = np.full((self.height, self.width), ord(" "), dtype=dtype)
+        for i, line in enumerate(lines):
+            grid[i, :len(line)] = np.frombuffer(
+                line.encode(encoding), dtype=dtype
+            )
+
+        # Starts and goals in reading order; start and goal are the first
+        self.starts = [
+            (int(i), int(j)) for i, j in np.argwhere(grid == ord("A"))
+        ]
+        self.goals = [
+            (int(i), int(j)) for i, j in np.argwhere(grid == ord("B"))
+        ]
+        self.start = self.starts[0]
+        self.goal = self.goals[0]
+        self.goal_cells = {self.cell(goal) for goal in self.goals}
+
+        # Digits 1-9 are open terrain costing that much to step onto;
+        # every other open cell costs 1, and walls 0
+        digits = (grid >= ord("1")) & (grid <= ord("9"))
+        self.walls = ~(np.isin(grid, [ord(" "), ord("A"), ord("B")]) | digits)
+        self.costs = np.where(digits, grid - ord("0"), 1).astype(np.uint8)
+        self.costs[self.walls] = 0
+        self.weighted = bool(digits.any())
+
+        # Flat views of the walls and costs by cell index
+        self.cells = memoryview(self.walls.reshape(-1))
+        self.cell_costs = memoryview(self.costs.reshape(-1))
 
         self.solution = None
-
-
-    def Heuristic(self, frontier,explored):
-        distances = []
-        nodes = []
-        for node in frontier:
-            if node not in explored:
-                distance = abs(node.state[0] - self.goal[0]) + abs(node.state[1] - self.goal[1])
-                distances.append(distance)
-                nodes.append(node)
-        return nodes[distances.index(min(distances))],distances.index(min(distances))
+        self.solutions = None
+        self.distances = None
+        self.base_codes = None
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        codes = self.cell_codes()
+        chars = np.array(list(SYMBOLS))[codes]
+        terrain = (codes == EMPTY) & (self.costs > 1)
+        chars[terrain] = self.costs[terrain].astype(str)
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
+        print("\n".join("".join(row) for row in chars))
         print()
 
+    def cell_codes(self, show_solution=True, show_explored=False):
+        """
+        Returns a height x width array giving each cell's index into
+        SYMBOLS and COLORS. The walls, start and goal are worked out once
+        and reused; the solution and explored cells are laid over them.
+        """
+        if self.base_codes is None:
+            self.base_codes = np.where(self.walls, WALL, EMPTY)
+            self.base_codes = self.base_codes.astype(np.uint8)
+            self.base_codes[tuple(np.array(self.starts).T)] = START
+            self.base_codes[tuple(np.array(self.goals).T)] = GOAL
+
+        codes = self.base_codes
+        if self.solution is None:
+            return codes
+
+        # Show every start's path after solve_all, else the one solution
+        codes = codes.copy()
+        cells = self.solution[1]
+        if self.solutions is not None:
+            cells = [
+                cell for solution in self.solutions.values()
+                if solution is not None for cell in solution[1]
+            ]
+        if show_solution and cells:
+            rows, cols = zip(*cells)
+            path = (np.array(rows), np.array(cols))
+            codes[path] = np.where(codes[path] == EMPTY, SOLUTION, codes[path])
+        if show_explored:
+            codes[self.explored.to_array() & (codes == EMPTY)] = EXPLORED
+        return codes
+
+    def cell(self, state):
+        return state[0] * self.width + state[1]
+
+    def goal_heuristic(self, heuristic):
+        """
+        Returns a function estimating the distance from a flat cell to
+        the nearest goal by `heuristic`.
+
+        Only "manhattan" has a fast path for many goals, reading a
+        precomputed distance transform. Any other heuristic takes the
+        minimum over every goal on each call, which costs O(goals).
+        """
+        state = self.state
+        goals = self.goals
+        if len(goals) == 1:
+            goal = goals[0]
+            return lambda cell: heuristic(state(cell), goal)
+        if heuristic is manhattan and len(goals) > MANY_GOALS:
+            return memoryview(self.goal_distances().reshape(-1)).__getitem__
+        return lambda cell: min(heuristic(state(cell), goal) for goal in goals)
+
+    def goal_distances(self):
+        """
+        Returns the Manhattan distance from every cell to the nearest
+        goal, ignoring walls, as a height x width array.
+
+        The distance transform is separable: a forward and backward pass
+        along each row give the distance within the row, and the same
+        passes down each column then add the best vertical offset.
+        """
+        distances = np.full(
+            (self.height, self.width), self.height + self.width,
+            dtype=np.int32
+        )
+        distances[tuple(np.array(self.goals).T)] = 0
+        for j in range(1, self.width):
+            np.minimum(distances[:, j], distances[:, j - 1] + 1,
+                       out=distances[:, j])
+        for j in range(self.width - 2, -1, -1):
+            np.minimum(distances[:, j], distances[:, j + 1] + 1,
+                       out=distances[:, j])
+        for i in range(1, self.height):
+            np.minimum(distances[i], distances[i - 1] + 1, out=distances[i])
+        for i in range(self.height - 2, -1, -1):
+            np.minimum(distances[i], distances[i + 1] + 1, out=distances[i])
+        return distances
+
+    def state(self, cell):
+        return divmod(cell, self.width)
 
     def neighbors(self, state):
-        row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
+        return [
+            (action, self.state(cell))
+            for action, cell in self.neighbor_cells(self.cell(state))
         ]
 
+    def neighbor_cells(self, cell):
+        """
+        Returns (action, cell) for the open cells next to a flat index.
+        """
+        width = self.width
+        walls = self.cells
+        row, col = divmod(cell, width)
+
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        if row > 0 and not walls[cell - width]:
+            result.append(("up", cell - width))
+        if row < self.height - 1 and not walls[cell + width]:
+            result.append(("down", cell + width))
+        if col > 0 and not walls[cell - 1]:
+            result.append(("left", cell - 1))
+        if col < width - 1 and not walls[cell + 1]:
+            result.append(("right", cell + 1))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, heuristic="manhattan", algorithm="greedy"):
+        """
+        Finds a solution to maze, if one exists.
+
+        `algorithm` is "dfs" or "bfs" to search without a heuristic.
+        Otherwise `heuristic` is a name from HEURISTICS or a function of
+        (state, goal). The "greedy" algorithm always expands the node
+        closest to the goal by the heuristic; "astar" expands the lowest
+        cost so far plus heuristic, and "dijkstra" is A* with the "zero"
+        heuristic. "jps" is A* over jump points (see solve_jump_points).
+
+        Only "astar" and "dijkstra" account for terrain costs, finding
+        the cheapest path; the others treat every step as costing 1.
+
+        The search starts from `start` and stops at whichever goal it
+        reaches first; the informed searches aim for the nearest goal.
+        """
+        if algorithm == "dijkstra":
+            heuristic, algorithm = zero, "astar"
+        if isinstance(heuristic, str):
+            heuristic = HEURISTICS[heuristic]
+        if algorithm == "jps":
+            return self.solve_jump_points(heuristic)
+        if algorithm not in ("dfs", "bfs", "greedy", "astar"):
+            raise ValueError(f"unknown algorithm: {algorithm}")
+        informed = algorithm in ("greedy", "astar")
+        greedy = algorithm == "greedy"
+        costs = self.cell_costs
 
         # Keep track of number of states explored
         self.num_explored = 0
 
-        # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        
-        
-        frontier = StackFrontier()
-
-        frontier.Add(start)
+        # Search over flat cell indices; heuristics still see states
+        start = Node(state=self.cell(self.start), parent=None, action=None)
+        goals = self.goal_cells
+        estimate = self.goal_heuristic(heuristic)
+        if algorithm == "dfs":
+            frontier = StackFrontier()
+            frontier.Add(start)
+        elif algorithm == "bfs":
+            frontier = QueueFrontier()
+            frontier.Add(start)
+        else:
+            frontier = PriorityFrontier()
+            frontier.Add(start, estimate(start.state))
 
         # Initialize an empty explored set
-        self.explored = set()
+        self.explored = CellSet(self.width, self.height)
 
         # Keep looping until solution found
         while True:
 
             # If nothing left in frontier, then no path
             if frontier.Empty():
-                raise Exception("no solution")
+                raise NoSolution("no solution")
 
-            # Choose a node from the frontier
-            # alternative for bfs and dfs and for lifo and fifo:
-
-            # node = frontier.Remove()
-
-            node,index = self.Heuristic(frontier=frontier.frontier,explored=self.explored)
-            frontier.frontier.pop(index)
+            # Choose the most promising node, skipping entries for states
+            # that were reached again more cheaply and already expanded
+            node = frontier.Remove()
+            if self.explored.has_cell(node.state):
+                continue
             self.num_explored += 1
 
-            # If node is the goal, then we have a solution
-            if node.state == self.goal:
+            # If node is a goal, then we have a solution
+            if node.state in goals:
                 actions = []
                 cells = []
                 while node.parent is not None:
                     actions.append(node.action)
-                    cells.append(node.state)
+                    cells.append(self.state(node.state))
                     node = node.parent
                 actions.reverse()
                 cells.reverse()
@@ -188,75 +491,449 @@ class Maze():
                 return
 
             # Mark node as explored
-            self.explored.add(node.state)
-
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.Add(child)
-
-
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+            self.explored.add_cell(node.state)
+
+            # Add neighbors to frontier, or move them up if this is a
+            # better way to reach them
+            for action, cell in self.neighbor_cells(node.state):
+                if self.explored.has_cell(cell):
+                    continue
+                if not informed:
+                    if not frontier.contains_state(cell):
+                        child = Node(state=cell, parent=node, action=action)
+                        frontier.Add(child)
+                    continue
+                cost = node.cost + costs[cell]
+                priority = estimate(cell)
+                if not greedy:
+                    priority += cost
+                if priority < frontier.priority(cell):
+                    child = Node(state=cell, parent=node, action=action,
+                                 cost=cost)
+                    frontier.Add(child, priority)
+
+
+    def solve_jump_points(self, heuristic=manhattan):
+        """
+        Finds a shortest solution with Jump Point Search for 4-connected
+        grids: A* that only expands jump points, scanning straight over
+        the open cells between them instead of expanding each one.
+
+        Paths are kept canonical by moving horizontally only straight
+        ahead, unless a wall beside the path ends and opens a turn, and
+        by stopping vertical scans wherever a horizontal scan would find
+        a jump point. num_explored and explored count jump points only.
+        Jumping over cells assumes they all cost the same, so weighted
+        mazes are rejected.
+        """
+        self.require_uniform("jump point search")
+        self.num_explored = 0
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+        start = Node(state=self.cell(self.start), parent=None, action=None)
+        goals = self.goal_cells
+        estimate = self.goal_heuristic(heuristic)
+        frontier = PriorityFrontier()
+        frontier.Add(start, estimate(start.state))
+        self.explored = CellSet(self.width, self.height)
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        while True:
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+            if frontier.Empty():
+                raise NoSolution("no solution")
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+            node = frontier.Remove()
+            if self.explored.has_cell(node.state):
+                continue
+            self.num_explored += 1
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+            if node.state in goals:
+                self.solution = self.unpack_jumps(node)
+                return
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+            self.explored.add_cell(node.state)
+
+            for action in self.jump_directions(node.state, node.action):
+                cell = self.jump(node.state, action, goals)
+                if cell is None or self.explored.has_cell(cell):
+                    continue
+                cost = node.cost + self.distance(node.state, cell)
+                priority = cost + estimate(cell)
+                if priority < frontier.priority(cell):
+                    child = Node(state=cell, parent=node, action=action,
+                                 cost=cost)
+                    frontier.Add(child, priority)
+
+    def jump_directions(self, cell, action):
+        """
+        Returns the directions worth jumping in from a jump point that
+        was reached by moving in direction `action`.
+        """
+        if action is None:
+            return list(DIRECTIONS)
+        if action in ("up", "down"):
+            return [action, "left", "right"]
+
+        # Moving sideways, only turn where the wall behind a side ends
+        result = [action]
+        walls = self.cells
+        width = self.width
+        back = -DIRECTIONS[action][1]
+        row = cell // width
+        if row > 0 and not walls[cell - width] and walls[cell - width + back]:
+            result.append("up")
+        if (row < self.height - 1 and not walls[cell + width]
+                and walls[cell + width + back]):
+            result.append("down")
+        return result
 
+    def jump(self, cell, action, goals):
+        """
+        Returns the next jump point from `cell` in direction `action`,
+        or None if the scan runs into a wall or the edge of the maze.
+        """
+        drow, dcol = DIRECTIONS[action]
+        if dcol:
+            return self.jump_horizontal(cell, dcol, goals)
+
+        walls = self.cells
+        row, col = divmod(cell, self.width)
+        step = drow * self.width
+        while True:
+            row += drow
+            cell += step
+            if not 0 <= row < self.height or walls[cell]:
+                return None
+            if (cell in goals
+                    or self.jump_horizontal(cell, -1, goals) is not None
+                    or self.jump_horizontal(cell, 1, goals) is not None):
+                return cell
+
+    def jump_horizontal(self, cell, dcol, goals):
+        walls = self.cells
+        width = self.width
+        row, col = divmod(cell, width)
+        up = row > 0
+        down = row < self.height - 1
+        while True:
+            col += dcol
+            cell += dcol
+            if not 0 <= col < width or walls[cell]:
+                return None
+            if cell in goals:
+                return cell
+
+            # A wall beside the previous cell that ends here opens a turn
+            if up and not walls[cell - width] and walls[cell - width - dcol]:
+                return cell
+            if down and not walls[cell + width] and walls[cell + width - dcol]:
+                return cell
+
+    def distance(self, cell, other):
+        return manhattan(self.state(cell), self.state(other))
+
+    def unpack_jumps(self, node):
+        """
+        Returns (actions, cells) for the path ending at `node`, filling
+        in the cells between consecutive jump points.
+        """
+        actions = []
+        cells = []
+        while node.parent is not None:
+            drow, dcol = DIRECTIONS[node.action]
+            step = drow * self.width + dcol
+            cell = node.state
+            while cell != node.parent.state:
+                actions.append(node.action)
+                cells.append(self.state(cell))
+                cell -= step
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+    def solve_wavefront(self):
+        """
+        Finds a shortest solution by computing the distance to the
+        nearest goal of every cell up to the start, then walking
+        downhill from it.
+        """
+        self.require_uniform("the wavefront solver")
+        self.distances = self.distance_field(stop=[self.start])
+        reached = self.distances >= 0
+        self.num_explored = int(np.count_nonzero(reached))
+        self.explored = CellSet.from_array(reached)
+
+        solution = self.descend(self.distances)
+        if solution is None:
+            raise NoSolution("no solution")
+        self.solution = solution
+
+    def solve_all(self, algorithm=None):
+        """
+        Finds a shortest path from every start to its nearest goal with
+        a single search from all the goals at once.
+
+        `algorithm` is "wavefront" (breadth-first, for mazes without
+        terrain costs) or "dijkstra" (cheapest paths over terrain, see
+        cost_field). By default weighted mazes use "dijkstra" and the
+        rest "wavefront".
+
+        Sets solutions to a dict mapping each start to (actions, cells),
+        or None if it cannot reach any goal, and solution to the cheapest
+        of them. Raises if no start can reach a goal.
+        """
+        if algorithm is None:
+            algorithm = "dijkstra" if self.weighted else "wavefront"
+        if algorithm == "wavefront":
+            self.require_uniform("the wavefront solver")
+            self.distances = self.distance_field(stop=self.starts)
+        elif algorithm == "dijkstra":
+            self.distances = self.cost_field(stop=self.starts)
+        else:
+            raise ValueError(f"unknown algorithm for solve_all: {algorithm}")
+        reached = self.distances >= 0
+        self.num_explored = int(np.count_nonzero(reached))
+        self.explored = CellSet.from_array(reached)
+
+        self.solutions = {
+            start: self.descend(self.distances, start)
+            for start in self.starts
+        }
+        found = [s for s in self.solutions.values() if s is not None]
+        if not found:
+            raise NoSolution("no solution")
+        self.solution = min(found, key=self.path_cost)
+
+    def require_uniform(self, solver):
+        if self.weighted:
+            raise ValueError(f"{solver} needs every open cell to cost 1")
+
+    def solution_cost(self):
+        """
+        Returns the total terrain cost of the solution's steps.
+        """
+        if self.solution is None:
+            return None
+        return self.path_cost(self.solution)
+
+    def path_cost(self, solution):
+        return sum(int(self.costs[cell]) for cell in solution[1])
+
+    def distance_field(self, sources=None, stop=None):
+        """
+        Returns an array of breadth-first distances from the nearest of
+        `sources` (the goals by default) to every cell, or -1 where none
+        can be reached.
+
+        The wavefront is kept as the flat indices of the cells it last
+        reached, so each cell is visited once whatever the maze's shape.
+        Narrow wavefronts, as in corridor mazes, are grown one cell at a
+        time; once one spans DENSE_WAVEFRONT cells, as in open rooms, all
+        its neighbours are gathered and filtered with array operations.
+        With a list of `stop` states, the wavefront halts once it has
+        reached them all.
+        """
+        sources = self.goals if sources is None else sources
+        width = self.width
+        size = self.height * width
+        distances = np.full(size, -1, dtype=np.int32)
+        frontier = sorted({self.cell(source) for source in sources})
+        distances[frontier] = 0
+
+        # Open cells the wavefront has not reached yet
+        free = ~self.walls.reshape(-1)
+        free[frontier] = False
+
+        # Count down the stop cells still to reach
+        is_stop = np.zeros(size, dtype=bool)
+        remaining = None
+        if stop is not None:
+            is_stop[[self.cell(state) for state in stop]] = True
+            remaining = int(np.count_nonzero(is_stop & free))
+
+        field = memoryview(distances)
+        unreached = memoryview(free)
+        stops = memoryview(is_stop)
+        distance = 0
+        while frontier and remaining != 0:
+            distance += 1
+            if len(frontier) < DENSE_WAVEFRONT:
+                grown = []
+                for cell in frontier:
+                    for _, neighbor in self.neighbor_cells(cell):
+                        if unreached[neighbor]:
+                            unreached[neighbor] = False
+                            field[neighbor] = distance
+                            grown.append(neighbor)
+                            if stops[neighbor]:
+                                remaining -= 1
+            else:
+                frontier = np.asarray(frontier)
+                cols = frontier % width
+                grown = np.concatenate((
+                    frontier[frontier >= width] - width,
+                    frontier[frontier < size - width] + width,
+                    frontier[cols > 0] - 1,
+                    frontier[cols < width - 1] + 1,
+                ))
+                grown = np.unique(grown[free[grown]])
+                free[grown] = False
+                distances[grown] = distance
+                if remaining is not None:
+                    remaining -= int(np.count_nonzero(is_stop[grown]))
+                grown = grown.tolist()
+            frontier = grown
+
+        return distances.reshape(self.height, width)
+
+    def cost_field(self, stop=None):
+        """
+        Returns an array of the cheapest terrain cost from every cell to
+        its nearest goal, or -1 where no goal can be reached.
+
+        Runs Dijkstra's algorithm backwards from all the goals at once:
+        a path pays the cost of each cell it steps onto, so reaching a
+        cell from a settled neighbour costs that neighbour's terrain.
+        With a list of `stop` states, the search halts once they are
+        all settled.
+        """
+        distances = np.full(self.height * self.width, -1, dtype=np.int32)
+        field = memoryview(distances)
+        costs = self.cell_costs
+        frontier = [(0, cell) for cell in sorted(self.goal_cells)]
+        remaining = None
+        if stop is not None:
+            remaining = {self.cell(state) for state in stop}
+
+        while frontier and remaining != set():
+            distance, cell = heapq.heappop(frontier)
+            if field[cell] >= 0:
+                continue
+            field[cell] = distance
+            if remaining is not None:
+                remaining.discard(cell)
+            distance += costs[cell]
+            for _, neighbor in self.neighbor_cells(cell):
+                if field[neighbor] < 0:
+                    heapq.heappush(frontier, (distance, neighbor))
+
+        return distances.reshape(self.height, self.width)
+
+    def descend(self, distances, start=None):
+        """
+        Returns (actions, cells) leading from `start` (the maze's start by
+        default) down a distance or cost field to its nearest source, or
+        None if the field does not reach `start`. Each step goes to a
+        neighbour whose value plus its terrain cost is the current value.
+        """
+        start = self.start if start is None else start
+        field = memoryview(distances.reshape(-1))
+        costs = self.cell_costs
+        cell = self.cell(start)
+        if field[cell] < 0:
+            return None
+
+        actions = []
+        cells = []
+        while field[cell] > 0:
+            for action, neighbor in self.neighbor_cells(cell):
+                if (field[neighbor] >= 0
+                        and field[neighbor] + costs[neighbor] == field[cell]):
+                    break
+            actions.append(action)
+            cells.append(self.state(neighbor))
+            cell = neighbor
+        return actions, cells
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        """
+        Save the maze as an image with each cell drawn as a square of
+        `cell_size` pixels, leaving `cell_border` pixels of black around
+        it. Use a small cell size (down to 1, without borders) for huge
+        mazes.
+        """
+        from PIL import Image
+
+        # One colour per cell, then one block of pixels per colour, with
+        # the border pixels of each block zeroed
+        codes = self.cell_codes(show_solution, show_explored)
+        colors = np.array(COLORS, dtype=np.uint8)
+        cells = colors[codes]
+
+        # Shade empty terrain by how much it costs to cross
+        if self.weighted:
+            terrain = codes == EMPTY
+            shade = (self.costs[terrain, None] - 1) / (MAX_COST - 1)
+            empty = np.array(COLORS[EMPTY])
+            cells[terrain] = empty + shade * (np.array(TERRAIN_COLOR) - empty)
+        block = np.zeros((cell_size, cell_size, 1), dtype=np.uint8)
+        if 2 * cell_border < cell_size:
+            inner = slice(cell_border, cell_size - cell_border + 1)
+        else:
+            inner = slice(0, cell_size)
+        block[inner, inner] = 1
+        img = Image.fromarray(np.kron(cells, block), "RGB")
         img.save(filename)
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
- 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze/maze.png", show_explored=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze")
+    parser.add_argument("maze", help="maze text file")
+    parser.add_argument("--algorithm", default=None,
+                        choices=("dfs", "bfs", "greedy", "astar", "dijkstra",
+                                 "jps", "wavefront"),
+                        help="search algorithm (default: greedy; several "
+                             "starts take wavefront or dijkstra)")
+    parser.add_argument("--heuristic", default=None,
+                        choices=sorted(HEURISTICS),
+                        help="heuristic for informed searches "
+                             "(default: manhattan)")
+    parser.add_argument("--image", default="maze/maze.png",
+                        help="where to save the solved maze image")
+    parser.add_argument("--cell-size", type=int, default=50,
+                        help="pixels per cell in the image")
+    parser.add_argument("--multiple", action="store_true",
+                        help="allow several starts and goals, solving "
+                             "every start towards its nearest goal")
+    args = parser.parse_args()
+
+    m = Maze(args.maze, multiple=args.multiple)
+
+    # Several starts are only solved together, by one search from the goals
+    if len(m.starts) > 1 and (
+        args.algorithm not in (None, "wavefront", "dijkstra")
+        or args.heuristic is not None
+    ):
+        parser.error("a maze with several starts is solved from the goals "
+                     "with --algorithm wavefront or dijkstra; other "
+                     "algorithms and --heuristic only apply to one start")
+    algorithm = args.algorithm or "greedy"
+    heuristic = args.heuristic or "manhattan"
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    try:
+        if len(m.starts) > 1:
+            m.solve_all(args.algorithm)
+        elif algorithm == "wavefront":
+            m.solve_wavefront()
+        else:
+            m.solve(heuristic, algorithm)
+    except (NoSolution, ValueError) as e:
+        sys.exit(f"Cannot solve {args.maze}: {e}")
+    if m.solutions is not None:
+        for start, solution in m.solutions.items():
+            length = "no path" if solution is None else len(solution[0])
+            print(f"Start {start}: {length}")
+    print("States Explored:", m.num_explored)
+    if m.weighted:
+        print("Solution Cost:", m.solution_cost())
+    print("Solution:")
+    m.print()
+    m.output_image(args.image, show_explored=True, cell_size=args.cell_size)
+
+
+if __name__ == "__main__":
+    main()